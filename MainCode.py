@@ -1,12 +1,28 @@
 # Function to extract text from the PDF
 import os
-import csv
 from striprtf.striprtf import rtf_to_text
 import re
 from datetime import datetime
-
-
-def extract_text_from_rtf(rtf_path):
+from functools import cached_property
+from itertools import repeat
+from extraction_cache import ExtractionCache, file_digest
+from text_cache import default_text_cache
+from rtf_stream import rtf_header_text
+from csv_stream import StreamingCSVWriter
+from case_parquet import csv_to_parquet
+from case_votes import VOTE_FIELDS
+
+
+def extract_text_from_rtf(rtf_path, text_cache=None, header_only=False):
+    # Converted text is reused from the shared cache when one is configured
+    text_cache = text_cache or default_text_cache()
+    if header_only:
+        # Stop decoding after the header sections; the body is skipped
+        if text_cache is not None:
+            return text_cache.header_for(rtf_path)
+        return rtf_header_text(rtf_path)[0]
+    if text_cache is not None:
+        return text_cache.text_for(rtf_path)
 
     with open(rtf_path, 'r', encoding='utf-8', errors='ignore') as file:
         rtf_content = file.read()
@@ -167,7 +183,8 @@ def extract_opinion_concur_dissent_authors(text):
     # Look for the opinion author or PER CURIAM
     opinion_match = re.search(r'Opinion by:?\s*([A-Z]+(?:\s+[A-Z]+)*)', text, re.IGNORECASE)
     if opinion_match:
-        opinion_author = opinion_match.group(1).strip()
+        # Keep only the line the author is named on
+        opinion_author = re.sub(r'\n.*', '', opinion_match.group(1).strip(), flags=re.DOTALL)
     elif 'PER CURIAM' in text.upper():
         opinion_author = 'PER CURIAM'
 
@@ -181,8 +198,8 @@ def extract_opinion_concur_dissent_authors(text):
     dissent_section = re.findall(r'Dissent by:?\s*([A-Z]+(?:\s+[A-Z]+)*)', text, re.IGNORECASE)
 
     # Remove any extra spaces, line breaks, or repeated names
-    concurring_authors = list(set([author.strip() for author in concur_section if author.strip()]))
-    dissent_authors = list(set([author.strip() for author in dissent_section if author.strip()]))
+    concurring_authors = list(dict.fromkeys(author.strip() for author in concur_section if author.strip()))
+    dissent_authors = list(dict.fromkeys(author.strip() for author in dissent_section if author.strip()))
 
     # Clean up extra new lines or duplicate entries
     concurring_authors = [re.sub(r'\n.*', '', author) for author in concurring_authors]
@@ -203,13 +220,19 @@ vote_mapping = {
     'Did not participate': 5
 }
 
-def extract_justices(text):
-    # Look for the "Judges:" section
-    judges_section = re.search(r'Judges:(.*?)(?:\n\n|$)', text, re.DOTALL | re.IGNORECASE)
+judges_section_pattern = re.compile(r'Judges:(.*?)(?:\n\n|$)', re.DOTALL | re.IGNORECASE)
+
+def extract_judges_section(text):
+    # Returns the text of the "Judges:" section, or '' if there is none
+    judges_section = judges_section_pattern.search(text)
+    return judges_section.group(1) if judges_section else ''
+
+def extract_justices(text, judges_text=None):
+    # Look for the "Judges:" section (callers that already have it can pass it in)
+    if judges_text is None:
+        judges_text = extract_judges_section(text)
     
-    if judges_section:
-        judges_text = judges_section.group(1)
-        
+    if judges_text:
         # Enhanced pattern to match judge names, including more prefixes and suffixes
         judge_pattern = r'(?:(?:VICE\s+)?(?:CHIEF|ASSOCIATE CHIEF)?\s*JUSTICE\s+)?([A-Z]+(?:[-\s][A-ZÑ]+)*|[A-ZÑ]+)(?:,?\s*(?:C\.J\.|J\.))?,?'
         
@@ -285,75 +308,98 @@ def extract_justices(text):
     return []
 
 
-def extract_votes_original(text):
-    votes = []
+# Matches every "NAME, J., <vote>" statement in a judges section in one pass.
+# NAME takes the whole run of name-like words before the comma, so it is
+# compared against the justices with endswith() below.
+vote_statement_pattern = re.compile(
+    r"(?P<name>[A-ZÑ][A-ZÑ'-]*(?:\s+[A-ZÑ][A-ZÑ'-]*)*),\s*J\.,\s*"
+    r"(?:(?P<dissent>dissents)"
+    r"|(?P<partial>concurs\s+in\s+part\s+and\s+dissents\s+in\s+part)"
+    r"|(?P<recused>recused)"
+    r"|(?P<absent>did\s+not\s+participate))",
+    re.IGNORECASE,
+)
+vote_statement_codes = {'dissent': 1, 'partial': 3, 'recused': 4, 'absent': 5}
+# If a justice is named in more than one statement, the earlier code here wins
+vote_code_precedence = {1: 0, 3: 1, 4: 2, 5: 3}
+vote_code_names = {code: name for name, code in vote_mapping.items()}
+
+def scan_vote_statements(judges_text):
+    # Returns [(NAME with spaces removed, vote code)] for each vote statement
+    statements = []
+    for match in vote_statement_pattern.finditer(judges_text):
+        name = re.sub(r'\s+', '', match.group('name')).upper()
+        statements.append((name, vote_statement_codes[match.lastgroup]))
+    return statements
+
+def classify_votes(justices_list, judges_text):
+    # Returns {justice: vote code} using the codes in vote_mapping
+    votes = {}
     
-    # Extract justices list from the text
-    justices_list = extract_justices(text)
-
     if not justices_list:
-        return ''  # Return an empty string if no justices are found
+        return votes
 
-    # Match for the "Judges:" section
-    judges_section = re.search(r'Judges:(.*?)(?:\n\n|$)', text, re.DOTALL | re.IGNORECASE)
-    if judges_section:
-        judges_text = judges_section.group(1)
-        print(f"Debug - Judges section: {judges_text}")  # Debug print
-        
-        for justice in justices_list:
-            if re.search(rf'{justice},\s*J\.,\s*dissents', judges_text, re.IGNORECASE):
-                votes.append(f"{justice}, 1")  # 1 for Dissent
-                print(f"Debug - {justice} dissents")  # Debug print
-            elif re.search(rf'{justice},\s*J\.,\s*concurs\s+in\s+part\s+and\s+dissents\s+in\s+part', judges_text, re.IGNORECASE):
-                votes.append(f"{justice}, 3")  # 3 for Concur in part and Dissent in part
-                print(f"Debug - {justice} concurs in part and dissents in part")  # Debug print
-            elif re.search(rf'{justice},\s*J\.,\s*recused', judges_text, re.IGNORECASE):
-                votes.append(f"{justice}, 4")  # 4 for Recuse
-                print(f"Debug - {justice} recused")  # Debug print
-            elif re.search(rf'{justice},\s*J\.,\s*did\s+not\s+participate', judges_text, re.IGNORECASE):
-                votes.append(f"{justice}, 5")  # 5 for Did not participate
-                print(f"Debug - {justice} did not participate")  # Debug print
-            elif re.search(rf'{justice}.*?concurs', judges_text, re.IGNORECASE):
-                votes.append(f"{justice}, 2")  # 2 for Concur
-                print(f"Debug - {justice} concurs")  # Debug print
-            else:
-                votes.append(f"{justice}, 2")  # Assume concurrence if not specified
-                print(f"Debug - {justice} assumed to concur")  # Debug print
+    print(f"Debug - Judges section: {judges_text}")  # Debug print
+    statements = scan_vote_statements(judges_text)
+    
+    for justice in justices_list:
+        key = justice.upper()
+        codes = [code for name, code in statements if name.endswith(key)]
+        # Anyone without a dissent/recusal/non-participation statement concurs
+        vote = min(codes, key=vote_code_precedence.get) if codes else 2
+        votes[justice] = vote
+        print(f"Debug - {justice}: {vote_code_names[vote]}")  # Debug print
 
-    return '; '.join(votes)
+    return votes
 
-def extract_votes_appellant_appellee(text, court_decision, votes_original):
-    votes = []
-    justices_list = extract_justices(text)
+def format_votes(votes):
+    # {justice: code} -> "NAME, code; NAME, code" as stored in the CSV
+    return '; '.join(f"{justice}, {vote}" for justice, vote in votes.items())
 
-    if not justices_list or not votes_original:
-        return ''
+def parse_votes(votes_string):
+    # Inverse of format_votes
+    if not votes_string:
+        return {}
+    return {justice: int(vote) for justice, vote in (vote.strip().split(', ') for vote in votes_string.split(';'))}
+
+def extract_votes_original(text):
+    judges_text = extract_judges_section(text)
+    justices_list = extract_justices(text, judges_text)
+    return format_votes(classify_votes(justices_list, judges_text))
 
-    # Parse the votes_original string
-    original_votes = dict(vote.strip().split(', ') for vote in votes_original.split(';'))
+def adjust_votes(original_votes, court_decision):
+    # Translates {justice: vote_mapping code} into appellant/appellee votes
+    votes = {}
 
     # If court_decision is 3 (mixed), all votes should be 3
     if court_decision == 3:
-        return '; '.join(f"{justice}, 3" for justice in original_votes.keys())
+        return {justice: 3 for justice in original_votes}
 
     majority_vote = 2 if court_decision == 2 else 1  # 2 for Appellee, 1 for Appellant
 
     for justice, vote in original_votes.items():
-        vote = int(vote)
         if vote == 1:  # Dissent
-            votes.append(f"{justice}, {3 - majority_vote}")  # Opposite of majority
+            votes[justice] = 3 - majority_vote  # Opposite of majority
         elif vote == 2:  # Concur
-            votes.append(f"{justice}, {majority_vote}")
+            votes[justice] = majority_vote
         elif vote == 3:  # Concur in part and Dissent in part
-            votes.append(f"{justice}, 3")
+            votes[justice] = 3
         elif vote == 4:  # Recuse
-            votes.append(f"{justice}, 4")
+            votes[justice] = 4
         elif vote == 5:  # Did not participate
-            votes.append(f"{justice}, 5")
+            votes[justice] = 5
         else:
-            votes.append(f"{justice}, {majority_vote}")  # Default to majority
+            votes[justice] = majority_vote  # Default to majority
 
-    return '; '.join(votes)
+    return votes
+
+def extract_votes_appellant_appellee(text, court_decision, votes_original):
+    justices_list = extract_justices(text)
+
+    if not justices_list or not votes_original:
+        return ''
+
+    return format_votes(adjust_votes(parse_votes(votes_original), court_decision))
 #def extract_justice_info(text, court_decision):
     #justices_info = []
     #justices_list = extract_justices(text)
@@ -417,15 +463,18 @@ def extract_votes_appellant_appellee(text, court_decision, votes_original):
     
     return justices_info[:9]  # Limit to maximum 9 justices
 def extract_justice_info(text, court_decision, votes_original, votes_appellant_appellee):
-    justices_info = []
     justices_list = extract_justices(text)
     
     if not justices_list:
         return []
 
-    # Parse the votes
-    original_votes = dict(vote.strip().split(', ') for vote in votes_original.split(';'))
-    appellant_appellee_votes = dict(vote.strip().split(', ') for vote in votes_appellant_appellee.split(';'))
+    return build_justice_info(text, justices_list, court_decision, parse_votes(votes_appellant_appellee))[:9]  # Limit to maximum 9 justices
+
+def build_justice_info(text, justices_list, court_decision, appellant_appellee_votes):
+    justices_info = []
+
+    if not justices_list:
+        return []
 
     majority_vote = 2 if court_decision == 1 else 1  # 2 for Appellee, 1 for Appellant
 
@@ -434,10 +483,10 @@ def extract_justice_info(text, court_decision, votes_original, votes_appellant_a
         for justice in justices_list:
             justices_info.append({
                 'name': justice,
-                'vote': int(appellant_appellee_votes.get(justice, str(majority_vote))),
+                'vote': appellant_appellee_votes.get(justice, majority_vote),
                 'opinion': 5  # Per curiam opinion
             })
-        return justices_info[:9]  # Return early for per curiam opinions
+        return justices_info  # Return early for per curiam opinions
 
     # Find the majority opinion author
     match_majority = re.search(r'(?:JUSTICE|CHIEF JUSTICE)\s+(\w+)\s+authored the opinion of the Court, in which\s+(.*?)(?:joined|\.)', text)
@@ -449,7 +498,7 @@ def extract_justice_info(text, court_decision, votes_original, votes_appellant_a
         # Add majority author
         justices_info.append({
             'name': majority_author,
-            'vote': int(appellant_appellee_votes.get(majority_author, str(majority_vote))),
+            'vote': appellant_appellee_votes.get(majority_author, majority_vote),
             'opinion': 1  # Writer of majority opinion
         })
         
@@ -457,7 +506,7 @@ def extract_justice_info(text, court_decision, votes_original, votes_appellant_a
         for justice in joined_justices:
             justices_info.append({
                 'name': justice,
-                'vote': int(appellant_appellee_votes.get(justice, str(majority_vote))),
+                'vote': appellant_appellee_votes.get(justice, majority_vote),
                 'opinion': 2  # Joins majority opinion without writing
             })
     
@@ -466,7 +515,7 @@ def extract_justice_info(text, court_decision, votes_original, votes_appellant_a
     
     for justice, opinion_type, joined in match_concur_dissent:
         opinion_type = opinion_type.lower()
-        vote = int(appellant_appellee_votes.get(justice, '3'))  # Default to 3 if not found
+        vote = appellant_appellee_votes.get(justice, 3)  # Default to 3 if not found
         
         if 'concurring in part and dissenting in part' in opinion_type:
             opinion = 9  # Concurs in part/dissents in part
@@ -486,93 +535,373 @@ def extract_justice_info(text, court_decision, votes_original, votes_appellant_a
         if not any(info['name'] == justice for info in justices_info):
             justices_info.append({
                 'name': justice,
-                'vote': int(appellant_appellee_votes.get(justice, str(majority_vote))),
+                'vote': appellant_appellee_votes.get(justice, majority_vote),
                 'opinion': 2  # Joins majority opinion without writing
             })
     
-    return justices_info[:9]  # Limit to maximum 9 justices # Limit to maximum 9 justices
+    return justices_info  # Every justice; the wide CSV columns keep the first 9
 
-def process_rtf_file(file_path):
-    text = extract_text_from_rtf(file_path)
-    
-    case_name = extract_case_name(text)
-    case_citation = extract_case_citation(text)
-    appellant, appellee = extract_parties(text)
-    decision_date = extract_decision_date(text)
-    disposition_code, court_decision, outcome_text = extract_disposition(text, disposition_mapping)
-    opinion_author, concurring_authors, dissent_authors = extract_opinion_concur_dissent_authors(text)
-    justices = extract_justices(text)
-    votes_original = extract_votes_original(text)
-    votes_appellant_appellee = extract_votes_appellant_appellee(text, court_decision, votes_original)
-    justice_info = extract_justice_info(text, court_decision, votes_original, votes_appellant_appellee)
+class ParsedCase:
+    """Text of one case plus the judges section, justices and vote maps,
+    each computed once and shared by the extractors in process_rtf_file."""
+
+    def __init__(self, text):
+        self.text = text
+
+    @cached_property
+    def judges_text(self):
+        return extract_judges_section(self.text)
+
+    @cached_property
+    def justices(self):
+        return extract_justices(self.text, self.judges_text)
+
+    @cached_property
+    def disposition(self):
+        # (disposition_code, court_decision, outcome_text)
+        return extract_disposition(self.text, disposition_mapping)
+
+    @property
+    def court_decision(self):
+        return self.disposition[1]
+
+    @cached_property
+    def votes_original(self):
+        return classify_votes(self.justices, self.judges_text)
+
+    @cached_property
+    def votes_appellant_appellee(self):
+        return adjust_votes(self.votes_original, self.court_decision)
+
+    @cached_property
+    def justice_info(self):
+        return build_justice_info(self.text, self.justices, self.court_decision, self.votes_appellant_appellee)
+
+def extract_vote_fields(case):
+    justice_info = case.justice_info[:9]
     
     justice_data = {}
     for i in range(1, 10):
         if i <= len(justice_info):
-            justice_data[f"j{i}_name"] = ''  # Placeholder for cross-referencing
+            justice_data[f"j{i}_name"] = justice_info[i-1]['name']
             justice_data[f"j{i}_vote"] = justice_info[i-1]['vote']
             justice_data[f"j{i}_opin"] = justice_info[i-1]['opinion']
         else:
             justice_data[f"j{i}_name"] = ''
             justice_data[f"j{i}_vote"] = 88  # Not relevant
             justice_data[f"j{i}_opin"] = 88
-    
-    law_area = extract_area_of_law(text)
-    prior_history = extract_prior_history(text)
-    
+
     return {
-        'case_name': case_name,
-        'case_citation': case_citation,
-        'appellant': appellant,
-        'appellee': appellee,
-        'decision_date': decision_date,
-        'disposition_code': disposition_code,
-        'court_decision': court_decision,
-        'outcome_text': outcome_text,
-        'opinion_author': opinion_author,
-        'concurring_authors': concurring_authors,
-        'dissent_authors': dissent_authors,
-        'justices': justices,
-        'votes_original': votes_original,
-        'votes_appellant_appellee': votes_appellant_appellee,
+        'justices': case.justices,
+        'votes_original': format_votes(case.votes_original),
+        'votes_appellant_appellee': format_votes(case.votes_appellant_appellee),
         **justice_data,
-        'law_area': law_area,
-        'prior_history': prior_history
+        'case_votes': case_vote_rows(case),
     }
-def process_rtf_folder(folder_path, output_csv):
-    results = []
+
+# votes_original code -> case_votes 'vote' (0 minority, 1 majority, 2 recused,
+# 3 not participating); partial concurrences have no single value
+original_vote_to_case_vote = {1: 0, 2: 1, 4: 2, 5: 3}
+# Fallback for justices only named in the opinion text, by opinion role
+opinion_to_case_vote = {1: 1, 2: 1, 3: 1, 4: 1, 5: 1, 6: 0, 7: 0}
+
+def case_vote_rows(case):
+    # One row per justice (no 9-justice cap) for the long case_votes table;
+    # see case_votes.VOTE_FIELDS
+    rows = []
+    for seat, info in enumerate(case.justice_info, start=1):
+        if info['name'] in case.votes_original:
+            vote = original_vote_to_case_vote.get(case.votes_original[info['name']], '')
+        else:
+            vote = opinion_to_case_vote.get(info['opinion'], '')
+        rows.append({
+            'seat': seat,
+            'judge_name': info['name'],
+            'vote': vote,
+            'vote_adjusted': info['vote'],
+            'opinion': info['opinion'],
+        })
+    return rows
+
+def extract_case_name_fields(case):
+    return {'case_name': extract_case_name(case.text)}
+
+def extract_case_citation_fields(case):
+    return {'case_citation': extract_case_citation(case.text)}
+
+def extract_party_fields(case):
+    appellant, appellee = extract_parties(case.text)
+    return {'appellant': appellant, 'appellee': appellee}
+
+def extract_decision_date_fields(case):
+    return {'decision_date': extract_decision_date(case.text)}
+
+def extract_disposition_fields(case):
+    disposition_code, court_decision, outcome_text = case.disposition
+    return {'disposition_code': disposition_code, 'court_decision': court_decision, 'outcome_text': outcome_text}
+
+def extract_author_fields(case):
+    opinion_author, concurring_authors, dissent_authors = extract_opinion_concur_dissent_authors(case.text)
+    return {'opinion_author': opinion_author, 'concurring_authors': concurring_authors, 'dissent_authors': dissent_authors}
+
+def extract_law_area_fields(case):
+    return {'law_area': extract_area_of_law(case.text)}
+
+def extract_prior_history_fields(case):
+    return {'prior_history': extract_prior_history(case.text)}
+
+# Output columns are produced group by group, in this order
+field_group_extractors = {
+    'case_name': extract_case_name_fields,
+    'case_citation': extract_case_citation_fields,
+    'parties': extract_party_fields,
+    'decision_date': extract_decision_date_fields,
+    'disposition': extract_disposition_fields,
+    'authors': extract_author_fields,
+    'votes': extract_vote_fields,
+    'law_area': extract_law_area_fields,
+    'prior_history': extract_prior_history_fields,
+}
+
+# How far each group's regex result can be trusted, from 0 (nothing found
+# where something should be) to 1. The hybrid extractor only asks the LLM
+# about groups below its threshold.
+def case_name_confidence(case, fields):
+    if not fields['case_name']:
+        return 0.0
+    # Numbered Lexis title line ("1. A v. B, ...") rather than the first "v." anywhere
+    return 0.9 if re.search(r'\d+\.\s*(.*?)\s*v\.\s*(.*?),', case.text, re.MULTILINE | re.IGNORECASE) else 0.5
+
+def case_citation_confidence(case, fields):
+    if not fields['case_citation']:
+        return 0.0
+    return 0.9 if re.search(r'\d', fields['case_citation']) else 0.4
+
+def party_confidence(case, fields):
+    if not fields['appellant'] or not fields['appellee']:
+        return 0.0
+    # Role words or whole sentences caught in a name mean the split went wrong
+    if any(re.search(r'appell', party, re.IGNORECASE) or len(party) > 150 for party in (fields['appellant'], fields['appellee'])):
+        return 0.2
+    # Explicit Appellant/Appellee roles, not just the two sides of the title
+    return 0.9 if re.search(r',\s*Appell(?:ant|ee)\b', case.text, re.IGNORECASE) else 0.5
+
+def decision_date_confidence(case, fields):
+    return 1.0 if fields['decision_date'] else 0.0
+
+def disposition_confidence(case, fields):
+    if not fields['outcome_text']:
+        return 0.0
+    if fields['disposition_code'] == 13:  # outcome text found but no phrase matched
+        return 0.2
+    # A long outcome paragraph can mention several dispositions; the first match may not be the ruling
+    return 0.95 if len(fields['outcome_text']) <= 300 else 0.6
+
+def author_confidence(case, fields):
+    if re.search(r'Opinion by:?|authored the opinion', case.text, re.IGNORECASE):
+        return 0.9
+    # Otherwise PER CURIAM is either stated or just the fallback
+    return 0.8 if 'PER CURIAM' in case.text.upper() else 0.3
+
+def vote_confidence(case, fields):
+    if not case.judges_text:
+        return 0.2
+    if not case.justices:
+        return 0.1
+    return 0.9 if 3 <= len(case.justices) <= 9 else 0.4
+
+def law_area_confidence(case, fields):
+    if fields['law_area']:
+        return 0.9
+    # No Headnotes section means there is nothing to find
+    return 0.0 if re.search(r'Headnotes', case.text) else 0.8
+
+def prior_history_confidence(case, fields):
+    if fields['prior_history']:
+        return 0.9
+    return 0.0 if re.search(r'Prior History', case.text) else 0.8
+
+field_group_confidence = {
+    'case_name': case_name_confidence,
+    'case_citation': case_citation_confidence,
+    'parties': party_confidence,
+    'decision_date': decision_date_confidence,
+    'disposition': disposition_confidence,
+    'authors': author_confidence,
+    'votes': vote_confidence,
+    'law_area': law_area_confidence,
+    'prior_history': prior_history_confidence,
+}
+
+# Bump a group's version whenever the extractors behind it change, so cached
+# results for that group (and the groups that depend on it) are recomputed.
+EXTRACTOR_VERSIONS = {
+    'case_name': 1,
+    'case_citation': 1,
+    'parties': 1,
+    'decision_date': 1,
+    'disposition': 1,
+    'authors': 2,
+    'votes': 3,
+    'law_area': 1,
+    'prior_history': 1,
+}
+field_group_dependencies = {
+    'votes': ['disposition'],  # the appellant/appellee votes use court_decision
+}
+
+def field_group_versions(header_only=False):
+    versions = {}
+    for group, version in EXTRACTOR_VERSIONS.items():
+        parts = [str(version)] + [str(EXTRACTOR_VERSIONS[dependency]) for dependency in field_group_dependencies.get(group, [])]
+        if header_only:
+            parts.append('header')  # header-only text can give different results
+        versions[group] = '.'.join(parts)
+    return versions
+
+def extract_field_groups(file_path, cached_groups=None, header_only=False):
+    # Runs the extractors for every group not already in cached_groups. The RTF
+    # is only read if at least one group has to be extracted. With header_only
+    # only the header is decoded (through the author lines, the "Opinion"
+    # heading and its byline), so cues that only appear further into the body
+    # ("JUSTICE X, dissenting") are not seen.
+    cached_groups = cached_groups or {}
+    groups = {}
+    case = None
+    for group, extractor in field_group_extractors.items():
+        if group in cached_groups:
+            groups[group] = cached_groups[group]
+            continue
+        if case is None:
+            case = ParsedCase(extract_text_from_rtf(file_path, header_only=header_only))
+        groups[group] = extractor(case)
+    return groups
+
+# Columns of the CSV written by process_rtf_folder, in order
+CASE_FIELDS = [
+    'case_id',  # 0-based row number; with state, joins to case_votes
+    'state',
+    'case_name', 'case_citation', 'appellant', 'appellee', 'decision_date',
+    'disposition_code', 'court_decision', 'outcome_text',
+    'opinion_author', 'concurring_authors', 'dissent_authors',
+    'justices', 'votes_original', 'votes_appellant_appellee',
+    *[f"j{i}_{field}" for i in range(1, 10) for field in ('name', 'vote', 'opin')],
+    'law_area', 'prior_history',
+]
+
+def process_rtf_file(file_path, cached_groups=None, header_only=False):
+    # The 'case_votes' entry holds the per-justice rows for case_votes.VOTE_FIELDS
+    groups = extract_field_groups(file_path, cached_groups, header_only)
+    return {field: value for fields in groups.values() for field, value in fields.items()}
+
+def _process_rtf_file_safe(file_path, cached_groups=None, header_only=False):
+    # Runs in the worker processes when process_rtf_folder is given workers,
+    # so failures come back as data instead of killing the whole pool.
+    print(f"Processing file: {os.path.basename(file_path)}")
+    try:
+        return extract_field_groups(file_path, cached_groups, header_only), None, None
+    except Exception as e:
+        import traceback
+        return None, str(e), traceback.format_exc()
+
+def _load_cached_groups(cache, digest, versions):
+    cached_groups = cache.get(digest, versions)
+    if 'decision_date' in cached_groups:
+        decision_date = cached_groups['decision_date']['decision_date']
+        if decision_date:
+            cached_groups['decision_date']['decision_date'] = datetime.strptime(decision_date, '%Y-%m-%d').date()
+    return cached_groups
+
+def folder_state(folder_path):
+    # The two-letter state code of a state folder such as States/AZ, or None
+    name = os.path.basename(os.path.normpath(folder_path))
+    return name.upper() if len(name) == 2 and name.isalpha() else None
+
+def process_rtf_folder(folder_path, output_csv, workers=None, cache_path=None, header_only=False, parquet_output=None, votes_output=None, state=None):
+    # state defaults to the folder name when it is a two-letter code
+    state = state or folder_state(folder_path)
     rtf_files = [f for f in os.listdir(folder_path) if f.lower().endswith('.rtf')]
+    file_paths = [os.path.join(folder_path, filename) for filename in rtf_files]
     print(f"Found {len(rtf_files)} RTF files.")
     print(f"Starting to process {len(rtf_files)} RTF files...")
+
+    # With a cache, files whose content and extractor versions are unchanged
+    # since the last run are not read again; the rest only rerun stale groups.
+    cache = ExtractionCache(cache_path) if cache_path else None
+    versions = field_group_versions(header_only)
+    digests = [file_digest(file_path) for file_path in file_paths] if cache else [None] * len(file_paths)
+    cached = [_load_cached_groups(cache, digest, versions) for digest in digests] if cache else [{}] * len(file_paths)
+    if cache:
+        fully_cached = sum(len(groups) == len(versions) for groups in cached)
+        print(f"{fully_cached} of {len(rtf_files)} files are fully cached in {cache_path}.")
+
+    # Rows are written as each file finishes, so memory stays flat and a
+    # crash keeps everything processed so far in output_csv + '.partial'.
+    processed = 0
+    votes_writer = StreamingCSVWriter(votes_output, VOTE_FIELDS) if votes_output else None
+    try:
+        with StreamingCSVWriter(output_csv, CASE_FIELDS) as writer:
+            if workers and workers > 1:
+                # Fan the files out over a process pool; map() hands results back in
+                # the same order as rtf_files, so the CSV matches a serial run.
+                from concurrent.futures import ProcessPoolExecutor
+                print(f"Using {workers} worker processes.")
+                chunksize = max(1, len(file_paths) // (workers * 4))
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    outcomes = executor.map(_process_rtf_file_safe, file_paths, cached, repeat(header_only), chunksize=chunksize)
+                    for filename, digest, outcome in zip(rtf_files, digests, outcomes):
+                        processed += _collect_outcome(filename, outcome, writer, votes_writer, cache, digest, versions, state)
+            else:
+                for filename, file_path, digest, cached_groups in zip(rtf_files, file_paths, digests, cached):
+                    outcome = _process_rtf_file_safe(file_path, cached_groups, header_only)
+                    processed += _collect_outcome(filename, outcome, writer, votes_writer, cache, digest, versions, state)
+        if votes_writer:
+            votes_writer.close()
+    finally:
+        if votes_writer:
+            votes_writer.abort()
+        if cache:
+            cache.close()
     
-    for filename in rtf_files:
-        file_path = os.path.join(folder_path, filename)
-        print(f"Processing file: {filename}")
-        try:
-            result = process_rtf_file(file_path)
-            results.append(result)
-            print(f"Successfully processed: {filename}")
-        except Exception as e:
-            print(f"Error processing {filename}: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
-    
-    print(f"Finished processing. Successfully processed {len(results)} out of {len(rtf_files)} files.")
-
-    if results:
-        keys = results[0].keys()
-        with open(output_csv, 'w', newline='', encoding='utf-8') as output_file:
-            dict_writer = csv.DictWriter(output_file, keys)
-            dict_writer.writeheader()
-            dict_writer.writerows(results)
+    print(f"Finished processing. Successfully processed {processed} out of {len(rtf_files)} files.")
+
+    if processed:
         print(f"Results saved to {output_csv}")
+        if votes_writer and votes_writer.rows_written:
+            print(f"Per-justice votes saved to {votes_output}")
+        if parquet_output:
+            # Typed copy for analysis: small-int codes, dictionary-encoded text
+            csv_to_parquet(output_csv, parquet_output)
     else:
         print("No RTF files were successfully processed.")
 
+def _collect_outcome(filename, outcome, writer, votes_writer=None, cache=None, digest=None, versions=None, state=None):
+    # Writes one file's row (and caches its field groups); returns 1 on success
+    groups, error, error_traceback = outcome
+    if error is not None:
+        print(f"Error processing {filename}: {error}")
+        print(error_traceback)
+        return 0
+    # Numbered from 0 like case_votes.convert_combined_csv
+    case_id = writer.rows_written
+    row = {'case_id': case_id, 'state': state}
+    row.update(field_value for fields in groups.values() for field_value in fields.items())
+    case_votes = row.pop('case_votes', [])
+    writer.writerow(row)
+    if votes_writer:
+        for vote_row in case_votes:
+            votes_writer.writerow({'case_id': case_id, 'state': state, **vote_row})
+    if cache:
+        cache.put(digest, versions, groups)
+        if writer.rows_written % 100 == 0:
+            cache.commit()
+    print(f"Successfully processed: {filename}")
+    return 1
 
 if __name__ == "__main__":
     folder_path = '/Users/katedegroote/Thesis/States/AZ'
     output_csv = 'output_results.csv'
+    workers = os.cpu_count()  # Set to None to process the files one at a time
     
     print(f"Checking folder: {folder_path}")
     
@@ -584,7 +913,7 @@ if __name__ == "__main__":
         print(f"Found {len(rtf_files)} RTF files.")
         
         if rtf_files:
-            process_rtf_folder(folder_path, output_csv)
+            process_rtf_folder(folder_path, output_csv, workers=workers)
         else:
             print("No RTF files were found in the specified folder.")
 
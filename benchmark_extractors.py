@@ -0,0 +1,124 @@
+import contextlib
+import csv
+import glob
+import os
+import sys
+import time
+from MainCode import ParsedCase, extract_text_from_rtf, field_group_extractors, process_rtf_file
+from synthetic_corpus import write_corpus
+from text_cache import TEXT_CACHE_ENV
+
+# Times MainCode on synthetic corpora of increasing size. Stages:
+#   rtf_to_text       decoding the RTF (text cache disabled)
+#   <group>           one field group extractor on a fresh ParsedCase, so
+#                     shared work (judges section, disposition) is counted in
+#                     every group that needs it
+#   all_groups        every extractor on one ParsedCase, as process_rtf_file runs them
+#   process_rtf_file  end to end, decoding included
+# Results are appended to a CSV; with a baseline CSV, stages that got slower
+# than the tolerance are reported. Generating and timing the 100k-file corpus
+# takes far longer than the others, so it only runs with --large:
+#   python benchmark_extractors.py [--large] [size ...]
+SIZES = [1000, 10000]
+LARGE_SIZE = 100000
+BENCHMARK_FIELDS = ['run', 'files', 'stage', 'seconds', 'ms_per_file', 'files_per_second']
+REGRESSION_TOLERANCE = 0.15
+REGRESSION_MIN_MS = 0.1  # sub-millisecond stages jitter by more than the tolerance
+
+
+def corpus_files(folder, count, seed=0):
+    """Returns the RTF paths of a synthetic corpus of count files, generating it unless it already exists."""
+    files = sorted(glob.glob(os.path.join(folder, '*', '*.rtf')))
+    if len(files) != count:
+        files = sorted(write_corpus(folder, count, seed))
+    return files
+
+
+def time_stages(files):
+    """Returns {stage: total seconds} over files; MainCode's debug prints are discarded while timing."""
+    totals = dict.fromkeys(['rtf_to_text', *field_group_extractors, 'all_groups', 'process_rtf_file'], 0.0)
+    clock = time.perf_counter
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for file_path in files:
+            start = clock()
+            text = extract_text_from_rtf(file_path)
+            totals['rtf_to_text'] += clock() - start
+
+            for group, extractor in field_group_extractors.items():
+                start = clock()
+                extractor(ParsedCase(text))
+                totals[group] += clock() - start
+
+            start = clock()
+            case = ParsedCase(text)
+            for extractor in field_group_extractors.values():
+                extractor(case)
+            totals['all_groups'] += clock() - start
+
+            start = clock()
+            process_rtf_file(file_path)
+            totals['process_rtf_file'] += clock() - start
+    return totals
+
+
+def benchmark_rows(run, files, totals):
+    return [
+        {
+            'run': run,
+            'files': len(files),
+            'stage': stage,
+            'seconds': round(seconds, 3),
+            'ms_per_file': round(1000 * seconds / len(files), 3),
+            'files_per_second': round(len(files) / seconds, 1) if seconds else '',
+        }
+        for stage, seconds in totals.items()
+    ]
+
+
+def compare_to_baseline(rows, baseline_path, tolerance=REGRESSION_TOLERANCE):
+    """Prints and returns the stages whose ms_per_file is more than tolerance above the baseline's last run."""
+    with open(baseline_path, newline='') as file:
+        baseline = {(int(row['files']), row['stage']): float(row['ms_per_file']) for row in csv.DictReader(file)}
+    regressions = []
+    for row in rows:
+        before = baseline.get((row['files'], row['stage']))
+        if before and row['ms_per_file'] > before * (1 + tolerance) and row['ms_per_file'] - before > REGRESSION_MIN_MS:
+            regressions.append(row)
+            print(f"Regression: {row['stage']} at {row['files']} files took {row['ms_per_file']} ms/file (baseline {before})")
+    if not regressions:
+        print(f"No stage is more than {tolerance:.0%} slower than {baseline_path}")
+    return regressions
+
+
+def run_benchmarks(sizes=SIZES, corpus_folder='benchmark_corpus', results_csv='benchmark_results.csv', baseline_csv=None, seed=0):
+    """Benchmarks every stage at each corpus size; appends the results to results_csv and returns them."""
+    if os.environ.pop(TEXT_CACHE_ENV, None):
+        print(f"Ignoring {TEXT_CACHE_ENV} so that RTF decoding is timed")
+    run = time.strftime('%Y-%m-%dT%H:%M:%S')
+    rows = []
+    for size in sizes:
+        files = corpus_files(os.path.join(corpus_folder, str(size)), size, seed)
+        print(f"Timing {len(files)} files...")
+        size_rows = benchmark_rows(run, files, time_stages(files))
+        for row in size_rows:
+            print(f"{row['files']:>7} files  {row['stage']:<17} {row['seconds']:>10.3f} s  {row['ms_per_file']:>9.3f} ms/file")
+        rows += size_rows
+
+    write_header = not os.path.exists(results_csv)
+    with open(results_csv, 'a', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=BENCHMARK_FIELDS)
+        if write_header:
+            writer.writeheader()
+        writer.writerows(rows)
+    print(f"Results appended to {results_csv}")
+
+    if baseline_csv and os.path.exists(baseline_csv):
+        compare_to_baseline(rows, baseline_csv)
+    return rows
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:] if size != '--large'] or list(SIZES)
+    if '--large' in sys.argv and LARGE_SIZE not in sizes:
+        sizes.append(LARGE_SIZE)
+    run_benchmarks(sizes, baseline_csv='benchmark_baseline.csv')
@@ -1,67 +1,211 @@
 import dask.dataframe as dd
 import dask
 from dask import delayed
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import re
 import glob
 import os
+import resource
+import sys
 from tqdm import tqdm
 
 # ... rest of the script remains the same
 
-def clean_names_vectorized(names):
-    def clean_single_name(name):
-        if pd.isna(name):
-            return ''
-        # Remove titles and suffixes
-        titles = r'\b(Mr\.|Mrs\.|Ms\.|Dr\.|Prof\.|Rev\.|Hon\.)\s'
-        suffixes = r'\s(Jr\.|Sr\.|I|II|III|IV|V|Esq\.)$'
-        name = re.sub(titles, '', name, flags=re.IGNORECASE)
-        name = re.sub(suffixes, '', name, flags=re.IGNORECASE)
-        
-        # Convert to lowercase
-        name = name.lower()
-        
-        # Split name into parts
-        parts = name.split(',')
-        
-        # Rearrange to "last, first" format
+title_pattern = re.compile(r'\b(Mr\.|Mrs\.|Ms\.|Dr\.|Prof\.|Rev\.|Hon\.)\s', re.IGNORECASE)
+suffix_pattern = re.compile(r'\s(Jr\.|Sr\.|I|II|III|IV|V|Esq\.)$', re.IGNORECASE)
+
+def clean_single_name(name):
+    # Reference implementation, one name at a time; clean_names_vectorized must match it
+    if pd.isna(name):
+        return ''
+    # Remove titles and suffixes
+    name = title_pattern.sub('', name)
+    name = suffix_pattern.sub('', name)
+    
+    # Convert to lowercase
+    name = name.lower()
+    
+    # Split name into parts
+    parts = name.split(',')
+    
+    # Rearrange to "last, first" format
+    if len(parts) > 1:
+        return f"{parts[0].strip()}, {' '.join(parts[1:]).strip()}"
+    else:
+        parts = name.split()
         if len(parts) > 1:
-            return f"{parts[0].strip()}, {' '.join(parts[1:]).strip()}"
+            return f"{parts[-1]}, {' '.join(parts[:-1])}"
         else:
-            parts = name.split()
-            if len(parts) > 1:
-                return f"{parts[-1]}, {' '.join(parts[:-1])}"
-            else:
-                return name.strip()
+            return name.strip()
+
+# The same steps as clean_single_name as Arrow (RE2) kernels. RE2 only agrees
+# with Python's re (Unicode \s and \b, $ before a final newline, Unicode
+# lowercasing) on printable ASCII, so other names take the reference path.
+printable_ascii_pattern = r'^[\x20-\x7e]*$'
+arrow_title_pattern = r'(?i)\b(Mr\.|Mrs\.|Ms\.|Dr\.|Prof\.|Rev\.|Hon\.)\s'
+arrow_suffix_pattern = r'(?i)\s(Jr\.|Sr\.|I|II|III|IV|V|Esq\.)$'
+
+def _split_pair(values, pattern, reverse=False):
+    # Splits each string once on pattern; returns (parts found, first part, second part)
+    parts = pc.split_pattern(values, pattern, max_splits=1, reverse=reverse)
+    found = pc.greater(pc.list_value_length(parts), 1)
+    parts = pc.if_else(found, parts, pa.scalar(['', ''], type=parts.type))
+    return found, pc.list_element(parts, 0), pc.list_element(parts, 1)
+
+def _clean_printable_names(names):
+    name = pc.replace_substring_regex(names, arrow_title_pattern, '')
+    name = pc.utf8_lower(pc.replace_substring_regex(name, arrow_suffix_pattern, ''))
+
+    # "last, first ..." keeps the part before the first comma; later commas become spaces
+    has_comma, last, first = _split_pair(name, ',')
+    with_comma = pc.binary_join_element_wise(
+        pc.utf8_trim_whitespace(last), pc.utf8_trim_whitespace(pc.replace_substring(first, ',', ' ')), ', '
+    )
+
+    # "first ... last" becomes "last, first ..." with single spaces
+    words = pc.replace_substring_regex(pc.utf8_trim_whitespace(name), ' +', ' ')
+    several_words, first, last = _split_pair(words, ' ', reverse=True)
+    without_comma = pc.if_else(several_words, pc.binary_join_element_wise(last, first, ', '), words)
+
+    return pc.if_else(has_comma, with_comma, without_comma)
+
+def clean_names_vectorized(names):
+    # Each distinct name is cleaned once, then the results are mapped back onto the rows
+    codes, uniques = pd.factorize(names)
+    uniques = pa.array(np.asarray(uniques, dtype=object), type=pa.string())
+    printable = pc.match_substring_regex(uniques, printable_ascii_pattern).to_numpy(zero_copy_only=False)
+    cleaned = _clean_printable_names(uniques).to_numpy(zero_copy_only=False)
+    for position in np.flatnonzero(~printable):
+        cleaned[position] = clean_single_name(uniques[position].as_py())
+    # Missing names (code -1) pick up the trailing ''
+    rows = pa.array(np.append(cleaned, ''), type=pa.string()).take(pa.array(np.where(codes < 0, len(cleaned), codes)))
+    return pd.Series(rows.to_pandas().array, index=names.index, name=names.name)
+
+def validate_clean_names(names, sample_size=100_000, random_state=0):
+    """Checks clean_names_vectorized against clean_single_name on a sample; returns the rows that differ."""
+    sample = names.sample(min(sample_size, len(names)), random_state=random_state)
+    expected = sample.apply(clean_single_name)
+    actual = clean_names_vectorized(sample)
+    mismatches = pd.DataFrame({'name': sample, 'expected': expected, 'actual': actual})[expected != actual]
+    print(f"{len(mismatches)} of {len(sample)} sampled names differ")
+    return mismatches
+
+def clean_last_names(clean_names):
+    """Returns the last name part of cleaned "last, first" names (the whole name when there is no comma)."""
+    return clean_names.fillna('').astype(str).str.split(',', n=1).str[0].str.strip()
+
+def name_key(clean_names, letters=1):
+    """Partition key of cleaned "last, first" names: the first letters of the last name, '_' for anything but a-z."""
+    keys = clean_last_names(clean_names).str[:letters].str.pad(letters, side='right', fillchar='_')
+    return keys.str.replace('[^a-z]', '_', regex=True)
+
+def build_search_lookup(search_names):
+    """Maps each cleaned search name to the search name(s) it came from, as a Series indexed by the clean name."""
+    # Empty keys (missing or blank names) would match every contributor without a name
+    keyed = search_names[search_names['clean_name'] != '']
+    lookup = keyed.groupby('clean_name', sort=False)['name'].agg(lambda names: '; '.join(names.astype(str).unique()))
+    lookup.index = pd.Index(lookup.index.astype(object))
+    return lookup
+
+# Columns read from the contributor chunks. bonica.cid stays float64 (the ids
+# need more than float32's 24 bits); the repetitive text columns are
+# categorical, which also keeps zip codes exactly as written.
+CONTRIBUTOR_DTYPES = {
+    'bonica.cid': 'float64',
+    'most.recent.contributor.name': 'str',
+    'most.recent.contributor.employer': 'category',
+    'most.recent.contributor.zipcode': 'category',
+    'most.recent.contributor.state': 'category',
+}
+CONTRIBUTOR_FIELDS = list(CONTRIBUTOR_DTYPES)
 
-    return names.apply(clean_single_name)
+def reset_peak_rss():
+    # Linux lets a process reset its peak RSS to the current RSS; elsewhere
+    # the peak stays the process-lifetime one
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')
+    except OSError:
+        pass
+
+def peak_rss_mb():
+    """Peak resident memory of this process since the last reset_peak_rss, in MB (the lifetime peak where it cannot be reset)."""
+    try:
+        with open('/proc/self/status') as file:
+            for line in file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
 
 @delayed
-def process_chunk(chunk_file, search_names):
-    dtypes = {
-        'bonica.cid': 'float64',
-        'most.recent.contributor.employer': 'object',
-        'most.recent.contributor.zipcode': 'float64'
-    }
-    chunk = pd.read_csv(chunk_file, dtype=dtypes, low_memory=False)
-    chunk['clean_name'] = clean_names_vectorized(chunk['most.recent.contributor.name'])
-    result = chunk[chunk['clean_name'].isin(search_names['clean_name'].tolist())]
+def process_chunk(chunk_file, search_lookup, fields=CONTRIBUTOR_FIELDS):
+    reset_peak_rss()
+    start_mb = peak_rss_mb()
+    columns = set(fields) | {'most.recent.contributor.name'}
+    chunk = pd.read_csv(
+        chunk_file, usecols=lambda column: column in columns,
+        dtype={column: dtype for column, dtype in CONTRIBUTOR_DTYPES.items() if column in columns},
+    )
+    result = match_search_names(chunk, search_lookup)
+    result = result[[field for field in fields if field in result.columns] + ['clean_name', 'matched_search_name']]
+    # A worker process runs one chunk at a time, so under the processes
+    # scheduler this peak is the chunk's; with threads it is the process's
+    peak_mb = peak_rss_mb()
+    print(f"{os.path.basename(chunk_file)}: {len(result)} matches in {len(chunk)} rows, peak RSS {peak_mb:.0f} MB ({peak_mb - start_mb:+.0f} MB for the chunk)")
+    return result
+
+def match_search_names(chunk, search_lookup):
+    """Returns the contributor rows whose cleaned name is in search_lookup, with the search name they matched."""
+    clean_names = clean_names_vectorized(chunk['most.recent.contributor.name'])
+    # Hash lookup of every clean name in the lookup's index; NaN where nothing matched
+    matched_search_names = clean_names.map(search_lookup)
+    matched = matched_search_names.notna().to_numpy()
+    # The new columns are only added to the (few) matched rows
+    result = chunk[matched].copy()
+    result['clean_name'] = clean_names[matched]
+    result['matched_search_name'] = matched_search_names[matched]
     return result
 
-def process_all_chunks(chunk_pattern, search_names_path, output_prefix):
+def load_search_lookup(search_names_path):
     print("Reading search names...")
     search_names = pd.read_csv(search_names_path)
     
     print("Cleaning search names...")
     search_names['clean_name'] = clean_names_vectorized(search_names['name'])
+    return build_search_lookup(search_names)
+
+def match_partitioned_contributors(dataset_path, search_names_path, states=None, letters=1):
+    """Matches the search names against split.split_parquet's dataset, reading only their name key (and state) partitions."""
+    search_lookup = load_search_lookup(search_names_path)
+    keys = sorted(name_key(search_lookup.index.to_series(), letters).unique())
+    filters = [('name_key', 'in', keys)]
+    if states:
+        filters.append(('state', 'in', list(states)))
+    print(f"Reading {len(keys)} name keys from {dataset_path}...")
+    contributors = pd.read_parquet(dataset_path, filters=filters)
+    result = match_search_names(contributors, search_lookup)
+    print(f"Number of matches found: {len(result)} of {len(contributors)} rows read")
+    return result
+
+def process_all_chunks(chunk_pattern, search_names_path, output_prefix, scheduler='threads'):
+    # One graph node shared by every chunk task. With the default threaded
+    # scheduler all chunks use that one lookup in memory; scheduler='processes'
+    # pickles it into every chunk task, but gives each chunk's peak memory on
+    # its own instead of the whole process's.
+    search_lookup = delayed(load_search_lookup(search_names_path), pure=True)
     
     print("Processing chunks...")
     chunk_files = glob.glob(chunk_pattern)
-    delayed_results = [process_chunk(file, search_names) for file in chunk_files]
+    delayed_results = [process_chunk(file, search_lookup) for file in chunk_files]
     
     print("Computing results (this may take a while)...")
-    results = dask.compute(*delayed_results)
+    results = dask.compute(*delayed_results, scheduler=scheduler)
     
     print("Combining results...")
     final_result = pd.concat(results, ignore_index=True)
@@ -0,0 +1,79 @@
+import re
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Arrow type for each column of the case datasets, matched on the column name.
+# Covers both the LLM/combined schema (J1_Vote, Disposition, ...) and the
+# regex pipeline's schema (j1_vote, disposition_code, ...). Anything not
+# listed is stored as a string.
+column_types = [
+    (re.compile(r'^j\d+_(vote|voteadjusted|opin)$', re.IGNORECASE), pa.int8()),
+    (re.compile(r'^j\d+_code$', re.IGNORECASE), pa.int16()),
+    (re.compile(r'^j\d+_name$', re.IGNORECASE), pa.dictionary(pa.int32(), pa.string())),
+    (re.compile(r'^(state|LegalArea|law_area)$'), pa.dictionary(pa.int32(), pa.string())),
+    (re.compile(r'^(fips|court_decision|Disposition|disposition_code|LegalAreaCode|outcome_ideology|outome_ideology)\s*$'), pa.int8()),
+    (re.compile(r'^(Month|Day|Year)$'), pa.int16()),
+    (re.compile(r'^case_id$'), pa.int32()),  # as in case_votes.vote_schema
+    (re.compile(r'^decision_date$'), pa.date32()),
+]
+
+
+def column_type(column):
+    for pattern, arrow_type in column_types:
+        if pattern.match(column):
+            return arrow_type
+    return pa.string()
+
+
+def case_schema(columns):
+    return pa.schema([(column, column_type(column)) for column in columns])
+
+
+def _typed_table(df, schema):
+    arrays = []
+    for field in schema:
+        values = df[field.name]
+        if pa.types.is_integer(field.type):
+            # CSVs store these as floats ("2.0"); refuse anything that is not a whole number
+            numbers = pd.to_numeric(values, errors='raise')
+            if not (numbers.dropna() % 1 == 0).all():
+                raise ValueError(f"Column {field.name!r} has non-integer values")
+            array = pa.array(numbers, from_pandas=True).cast(field.type)
+        elif pa.types.is_date(field.type):
+            array = pa.array(pd.to_datetime(values, errors='coerce').dt.date, type=field.type, from_pandas=True)
+        else:
+            array = pa.array(values.astype('object').where(values.notna(), None), type=pa.string())
+            if pa.types.is_dictionary(field.type):
+                array = array.dictionary_encode()
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def write_case_parquet(df, parquet_path):
+    """Writes a case table (e.g. the rows of combined_output_all_runs.csv) as typed Parquet."""
+    schema = case_schema(df.columns)
+    pq.write_table(_typed_table(df, schema), parquet_path, compression='zstd')
+
+
+def csv_to_parquet(csv_path, parquet_path, chunksize=100_000):
+    """Converts a case CSV to typed Parquet, one chunk of rows at a time."""
+    columns = pd.read_csv(csv_path, nrows=0).columns
+    schema = case_schema(columns)
+    text_columns = {field.name: str for field in schema if not pa.types.is_integer(field.type)}
+    rows = 0
+    with pq.ParquetWriter(parquet_path, schema, compression='zstd') as writer:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize, dtype=text_columns, keep_default_na=False, na_values=['']):
+            writer.write_table(_typed_table(chunk, schema))
+            rows += len(chunk)
+    print(f"Wrote {rows} rows to {parquet_path}")
+    return rows
+
+
+def load_cases(parquet_path, columns=None, filters=None):
+    """Reads a typed case Parquet file, only decoding the requested columns.
+
+    filters uses the pyarrow form, e.g. [('state', '==', 'MT')], and skips row
+    groups that cannot match.
+    """
+    return pd.read_parquet(parquet_path, columns=columns, filters=filters, dtype_backend='numpy_nullable')
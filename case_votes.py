@@ -0,0 +1,147 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# One row per justice per case, keyed by state and case_id (the 0-based row
+# number of the case in the CSV it came from). vote uses the combined
+# dataset's J*_Vote codes (0 minority, 1 majority, 2 recused, 3 not
+# participating), vote_adjusted its J*_VoteAdjusted codes and opinion
+# MainCode's j*_opin roles.
+VOTE_FIELDS = ['case_id', 'state', 'seat', 'judge_name', 'judge_code', 'vote', 'vote_adjusted', 'opinion']
+
+vote_schema = pa.schema([
+    ('case_id', pa.int32()),
+    ('state', pa.dictionary(pa.int32(), pa.string())),
+    ('seat', pa.int8()),
+    ('judge_name', pa.dictionary(pa.int32(), pa.string())),
+    ('judge_code', pa.int16()),
+    ('vote', pa.int8()),
+    ('vote_adjusted', pa.int8()),
+    ('opinion', pa.int8()),
+])
+
+# pandas dtypes matching vote_schema; nullable small ints keep the table compact
+vote_dtypes = {
+    'case_id': 'Int32',
+    'state': 'category',
+    'seat': 'Int8',
+    'judge_name': 'category',
+    'judge_code': 'Int16',
+    'vote': 'Int8',
+    'vote_adjusted': 'Int8',
+    'opinion': 'Int8',
+}
+
+
+wide_column_pattern = re.compile(r'^j(\d+)_(name|code|vote|voteadjusted|opin)$', re.IGNORECASE)
+NOT_RELEVANT = 88  # MainCode's filler for empty seats
+
+
+def wide_vote_columns(columns):
+    """Returns {seat: {field: column}} for the J1_Name ... J18_VoteAdjusted style columns."""
+    seats = {}
+    for column in columns:
+        match = wide_column_pattern.match(column)
+        if match:
+            seats.setdefault(int(match.group(1)), {})[match.group(2).lower()] = column
+    return dict(sorted(seats.items()))
+
+
+def _numbers(values):
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64', copy=True)
+
+
+def _codes(values):
+    # Vote and opinion codes; 88 there marks an empty seat. Judge codes are
+    # read with _numbers, since 88 is also a justice's code.
+    numbers = _numbers(values)
+    numbers[numbers == NOT_RELEVANT] = np.nan
+    return numbers
+
+
+def votes_from_wide(cases, case_ids=None):
+    """Melts the wide per-seat columns of a case table into the long vote table.
+
+    Works on the combined schema (J*_Name/Code/Vote/VoteAdjusted) and on
+    MainCode's (j*_name/vote/opin, where j*_vote is the appellant/appellee
+    vote). case_ids defaults to a case_id column, else the row position.
+    """
+    seats = wide_vote_columns(cases.columns)
+    # MainCode's j*_vote is the adjusted vote; its majority/minority vote is not in the wide table
+    regex_schema = any('opin' in fields for fields in seats.values()) and not any('voteadjusted' in fields for fields in seats.values())
+    if case_ids is None:
+        case_ids = cases['case_id'] if 'case_id' in cases.columns else np.arange(len(cases))
+    case_ids = np.asarray(case_ids, dtype='int32')
+    states = cases['state'].to_numpy(dtype=object) if 'state' in cases.columns else np.full(len(cases), None, dtype=object)
+    empty = np.full(len(cases), np.nan)
+
+    frames = []
+    for seat, fields in seats.items():
+        names = cases[fields['name']].to_numpy(dtype=object) if 'name' in fields else np.full(len(cases), None, dtype=object)
+        names = np.where(pd.isna(names) | (names == ''), None, names)
+        votes = _codes(cases[fields['vote']]) if 'vote' in fields else empty
+        frame = pd.DataFrame({
+            'case_id': case_ids,
+            'state': states,
+            'seat': seat,
+            'judge_name': names,
+            'judge_code': _numbers(cases[fields['code']]) if 'code' in fields else empty,
+            'vote': empty if regex_schema else votes,
+            'vote_adjusted': votes if regex_schema else (_codes(cases[fields['voteadjusted']]) if 'voteadjusted' in fields else empty),
+            'opinion': _codes(cases[fields['opin']]) if 'opin' in fields else empty,
+        })
+        # A seat is filled if anything identifies or records a vote for it
+        filled = frame['judge_name'].notna() | frame[['judge_code', 'vote', 'vote_adjusted', 'opinion']].notna().any(axis=1)
+        frames.append(frame[filled])
+
+    if not frames:
+        return _typed(pd.DataFrame(columns=list(vote_dtypes)))
+    votes = pd.concat(frames, ignore_index=True).sort_values(['case_id', 'seat'], kind='stable', ignore_index=True)
+    return _typed(votes)
+
+
+def _typed(votes):
+    votes = votes.copy()
+    for column, dtype in vote_dtypes.items():
+        if column not in votes.columns:
+            votes[column] = None
+        votes[column] = votes[column].astype(dtype)
+    return votes[list(vote_dtypes)]
+
+
+def write_votes(votes, output_path):
+    """Writes the vote table as Parquet (typed) or CSV, depending on the extension."""
+    if output_path.endswith('.parquet'):
+        pq.write_table(pa.Table.from_pandas(votes, schema=vote_schema, preserve_index=False), output_path, compression='zstd')
+    else:
+        votes.to_csv(output_path, index=False)
+    print(f"Wrote {len(votes)} vote rows to {output_path}")
+
+
+def load_votes(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, dtype_backend='numpy_nullable')
+    votes = pd.read_csv(path)
+    if 'state' not in votes.columns:
+        votes['state'] = None
+    return _typed(votes)
+
+
+def convert_combined_csv(csv_path, output_path):
+    """Builds the case_votes table for an existing wide CSV such as combined_output_all_runs.csv.
+
+    case_id is the 0-based row number of the case in the CSV.
+    """
+    cases = pd.read_csv(csv_path, low_memory=False)
+    votes = votes_from_wide(cases, case_ids=np.arange(len(cases)))
+    write_votes(votes, output_path)
+    return votes
+
+
+if __name__ == "__main__":
+    csv_path = 'combined_output_all_runs.csv'
+    output_path = os.path.splitext(csv_path)[0] + '_votes.parquet'
+    convert_combined_csv(csv_path, output_path)
@@ -1,23 +1,33 @@
 import openai
 import os
-import csv
 import json
 from striprtf.striprtf import rtf_to_text
+from text_cache import default_text_cache
+from csv_stream import StreamingCSVWriter, merge_csv_shards
+from case_parquet import csv_to_parquet
+from response_cache import ResponseCache, report_stats
+from prompt_sections import count_tokens, trim_case_text
 
 # Set your OpenAI API key
 openai.api_key = "your_openai_api_key"
+MODEL = "gpt-4"
+MAX_COMPLETION_TOKENS = 1000
+PROMPT_VERSION = 1  # bump whenever build_extraction_prompt changes, so cached responses are not reused
 
-def extract_text_from_rtf(rtf_path):
-    """Reads and converts RTF file to plain text."""
+def extract_text_from_rtf(rtf_path, text_cache=None):
+    """Reads and converts RTF file to plain text, reusing the shared text cache if one is configured."""
+    text_cache = text_cache or default_text_cache()
+    if text_cache is not None:
+        return text_cache.text_for(rtf_path)
     with open(rtf_path, 'r', encoding='utf-8', errors='ignore') as file:
         rtf_content = file.read()
     return rtf_to_text(rtf_content)
 
 
 
-def extract_variables_via_api(text):
-    """Sends text to OpenAI API to extract variables based on the structured prompt."""
-    prompt = f"""
+def build_extraction_prompt(text):
+    """Builds the structured extraction prompt for a case text."""
+    return f"""
     Please extract the following variables from the provided legal case text. Format the output as JSON with each variable as a key. Here are the variables, their expected formats, and specific requirements. Use the provided codes where applicable.
 
     General Information:
@@ -125,69 +135,131 @@ def extract_variables_via_api(text):
 
     Please return these variables exactly as specified in JSON format.
     """
-    
+
+def request_completion(prompt):
+    """Sends a prompt to the OpenAI API and returns the completion text."""
     response = openai.Completion.create(
-        model="gpt-4",
+        model=MODEL,
         prompt=prompt,
-        max_tokens=1000
+        max_tokens=MAX_COMPLETION_TOKENS
     )
     return response.choices[0].text.strip()
 
-def process_rtf_file_with_api(file_path):
-    """Processes a single RTF file by extracting text and sending it to the API for variable extraction."""
-    text = extract_text_from_rtf(file_path)
-    extracted_data = extract_variables_via_api(text)
+def extract_variables_via_api(text, response_cache=None):
+    """Sends text to OpenAI API to extract variables based on the structured prompt, unless the response is cached."""
+    if response_cache is not None:
+        cached = response_cache.get(text, MODEL, PROMPT_VERSION)
+        if cached is not None:
+            return cached
+    extracted_data = request_completion(build_extraction_prompt(text))
+    if response_cache is not None:
+        response_cache.put(text, MODEL, PROMPT_VERSION, extracted_data)
+    return extracted_data
+
+def process_rtf_file_with_api(file_path, response_cache=None):
+    """Processes a single RTF file by extracting the sections the prompt needs and sending them to the API for variable extraction."""
+    text = trim_case_text(extract_text_from_rtf(file_path))
+    extracted_data = extract_variables_via_api(text, response_cache)
     
     # Parse JSON from response text
     extracted_dict = json.loads(extracted_data)
+    extracted_dict['prompt_tokens'] = count_tokens(build_extraction_prompt(text), MODEL)
     
     return extracted_dict
-def process_state_folder(state_folder_path, state_code):
-    """Processes all RTF files in a state folder and writes the extracted data to a state-specific CSV file."""
-    results = []
+# Columns of the per-state and combined CSVs, in the order the prompt lists them
+MAX_JUDGES = 18  # largest bench in the combined dataset
+API_FIELDS = [
+    'fips', 'state', 'Title_P1', 'Title_P2', 'CitationNumber', 'LexisNexisCitation',
+    'Month', 'Day', 'Year', 'PriorHistory', 'ProceduralPosture', 'Disposition',
+    'LegalArea', 'LegalAreaCode', 'appellant', 'appellee', 'court_decision', 'outcome_text',
+    *[f"J{i}_{field}" for i in range(1, MAX_JUDGES + 1) for field in ('Vote', 'Name', 'Code', 'VoteAdjusted')],
+    'majority_vs_minority', 'prompt_tokens',
+]
+
+def process_state_folder(state_folder_path, state_code, response_cache=None):
+    """Processes all RTF files in a state folder, writing each result to the state CSV as it arrives."""
     rtf_files = [f for f in os.listdir(state_folder_path) if f.lower().endswith('.rtf')]
     print(f"Processing state folder for {state_code}: Found {len(rtf_files)} RTF files.")
 
-    for filename in rtf_files:
-        file_path = os.path.join(state_folder_path, filename)
-        try:
-            result = process_rtf_file_with_api(file_path)
-            results.append(result)
+    state_output_file = f"output_{state_code}.csv"
+    with StreamingCSVWriter(state_output_file, API_FIELDS) as state_writer:
+        for filename in rtf_files:
+            file_path = os.path.join(state_folder_path, filename)
+            try:
+                result = process_rtf_file_with_api(file_path, response_cache)
+            except Exception as e:
+                print(f"Error processing {filename}: {str(e)}")
+                continue
+            state_writer.writerow(result)
             print(f"Successfully processed file: {filename}")
-        except Exception as e:
-            print(f"Error processing {filename}: {str(e)}")
-
-        # Write results to a state-specific CSV file
-    if results:
-        state_output_file = f"output_{state_code}.csv"
-        keys = results[0].keys()
-        with open(state_output_file, 'w', newline='', encoding='utf-8') as output_file:
-            dict_writer = csv.DictWriter(output_file, keys)
-            dict_writer.writeheader()
-            dict_writer.writerows(results)
+
+    if state_writer.rows_written:
         print(f"Results for {state_code} saved to {state_output_file}")
     
-    return results  # Return results to also add to the combined CSV
-def process_all_states(base_folder):
-    """Processes each state folder and creates both individual state CSVs and a combined CSV for all states."""
-    combined_results = []
-    
-    for state_code in os.listdir(base_folder):
-        state_folder_path = os.path.join(base_folder, state_code)
-        if os.path.isdir(state_folder_path) and len(state_code) == 2:  # Ensure it's a two-letter state folder
+    return state_writer.rows_written  # Number of rows added for this state
+def _process_state_safe(state_folder_path, state_code, cache_path=None, offline=False):
+    # Runs in the worker processes when process_all_states is given workers;
+    # each worker opens its own connection to the response cache.
+    response_cache = ResponseCache(cache_path, offline) if cache_path else None
+    try:
+        rows = process_state_folder(state_folder_path, state_code, response_cache=response_cache)
+        error = None
+    except Exception as e:
+        rows, error = 0, str(e)
+    finally:
+        if response_cache is not None:
+            response_cache.close()
+    hits, misses = (response_cache.hits, response_cache.misses) if response_cache is not None else (0, 0)
+    return state_code, rows, hits, misses, error
+
+def process_all_states(base_folder, parquet_output=None, cache_path=None, offline=False, workers=None):
+    """Processes each state folder into its own CSV, then merges them into a combined CSV for all states (plus a typed Parquet copy if parquet_output is given).
+
+    With workers, that many states are processed at once. With cache_path, API responses are cached there and reused on reruns; offline=True only replays cached responses.
+    """
+    state_folders = {
+        state_code: os.path.join(base_folder, state_code)
+        for state_code in sorted(os.listdir(base_folder))
+        if os.path.isdir(os.path.join(base_folder, state_code)) and len(state_code) == 2  # Ensure it's a two-letter state folder
+    }
+
+    if workers and workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        # Largest states first, so the slow ones overlap with the rest instead of finishing last
+        by_size = sorted(state_folders, key=lambda state_code: len(os.listdir(state_folders[state_code])), reverse=True)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_process_state_safe, state_folders[state_code], state_code, cache_path, offline) for state_code in by_size]
+            outcomes = [future.result() for future in futures]
+    else:
+        outcomes = []
+        for state_code, state_folder_path in state_folders.items():
             print(f"Starting processing for state: {state_code}")
-            state_results = process_state_folder(state_folder_path, state_code)
-            combined_results.extend(state_results)  # Add state results to the combined list
-
-    # Write combined results to a single CSV file
-    if combined_results:
-        combined_output_file = "combined_output_all_states.csv"
-        keys = combined_results[0].keys()
-        with open(combined_output_file, 'w', newline='', encoding='utf-8') as output_file:
-            dict_writer = csv.DictWriter(output_file, keys)
-            dict_writer.writeheader()
-            dict_writer.writerows(combined_results)
+            outcomes.append(_process_state_safe(state_folder_path, state_code, cache_path, offline))
+
+    if cache_path:
+        report_stats(sum(outcome[2] for outcome in outcomes), sum(outcome[3] for outcome in outcomes))
+    merge_state_outputs([(state_code, rows, error) for state_code, rows, _, _, error in outcomes], parquet_output)
+
+def merge_state_outputs(outcomes, parquet_output=None):
+    """Merges the output_<state>.csv of every state that succeeded into the combined CSV.
+
+    outcomes holds a (state_code, rows, error) tuple per state; shared by
+    process_all_states and llm_async.aprocess_all_states.
+    """
+    combined_output_file = "combined_output_all_states.csv"
+    shards = []
+    for state_code, rows, error in sorted(outcomes):
+        if error is not None:
+            print(f"Error processing state {state_code}: {error}")
+        elif rows:
+            shards.append(f"output_{state_code}.csv")
+
+    # The state CSVs are streamed into the combined CSV, with the union of their columns
+    rows_written = merge_csv_shards(shards, combined_output_file) if shards else 0
+    if rows_written:
         print(f"Combined results saved to {combined_output_file}")
+        if parquet_output:
+            csv_to_parquet(combined_output_file, parquet_output)
     else:
         print("No data was processed for the combined CSV.")
 
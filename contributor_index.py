@@ -0,0 +1,149 @@
+import os
+import sqlite3
+import pandas as pd
+from bigcsvoutput import clean_last_names, clean_names_vectorized
+from dime_scan import DIME_COLUMNS, DIME_DTYPES
+from judge_resolver import CF_SCORES_PATH
+
+INDEX_COLUMNS = ['clean_name', 'last_name', 'state', 'zipcode', 'bonica_cid', 'name', 'employer']
+
+
+def _normalize_states(states):
+    states = states.astype('object').where(states.notna(), None)
+    return states.map(lambda state: state.strip().upper() if isinstance(state, str) else None)
+
+
+class ContributorIndex:
+    """SQLite index of the DIME contributors by cleaned "last, first" name and by last name and state.
+
+    Built once with build(); candidates() then answers a list of names from
+    the index instead of rescanning the contributors file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS contributors (
+                clean_name TEXT NOT NULL,
+                last_name TEXT NOT NULL,
+                state TEXT,
+                zipcode REAL,
+                bonica_cid REAL,
+                name TEXT,
+                employer TEXT
+            )"""
+        )
+        self.connection.commit()
+
+    def build(self, input_file, chunk_size=1000000):
+        """Loads the contributors file into the index, replacing its contents; returns the number of rows indexed."""
+        # A failed build is simply rerun, so the journal is not needed while loading
+        self.connection.execute("PRAGMA journal_mode = OFF")
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.execute("DROP INDEX IF EXISTS contributors_clean_name")
+        self.connection.execute("DROP INDEX IF EXISTS contributors_last_name_state")
+        self.connection.execute("DELETE FROM contributors")
+
+        rows = 0
+        reader = pd.read_csv(
+            input_file, chunksize=chunk_size, usecols=lambda column: column in DIME_COLUMNS,
+            dtype=DIME_DTYPES, encoding='latin-1', on_bad_lines='skip', low_memory=False,
+        )
+        for i, chunk in enumerate(reader):
+            clean_names = clean_names_vectorized(chunk['most.recent.contributor.name'])
+            records = pd.DataFrame({
+                'clean_name': clean_names,
+                'last_name': clean_last_names(clean_names),
+                'state': _normalize_states(chunk['most.recent.contributor.state']),
+                'zipcode': chunk['most.recent.contributor.zipcode'],
+                'bonica_cid': chunk['bonica.cid'],
+                'name': chunk['most.recent.contributor.name'],
+                'employer': chunk['most.recent.contributor.employer'],
+            })[lambda records: records['clean_name'] != '']
+            self.connection.executemany(
+                f"INSERT INTO contributors ({', '.join(INDEX_COLUMNS)}) VALUES ({', '.join('?' * len(INDEX_COLUMNS))})",
+                records.astype(object).where(records.notna(), None).itertuples(index=False, name=None),
+            )
+            rows += len(records)
+            print(f"Indexed chunk {i} ({rows} rows so far)")
+
+        print("Creating lookup indexes...")
+        self.connection.execute("CREATE INDEX contributors_clean_name ON contributors (clean_name)")
+        self.connection.execute("CREATE INDEX contributors_last_name_state ON contributors (last_name, state)")
+        self.connection.commit()
+        self.connection.execute("PRAGMA journal_mode = DELETE")
+        self.connection.execute("PRAGMA synchronous = FULL")
+        print(f"Finished indexing {rows} contributors into {self.path}")
+        return rows
+
+    def candidates(self, names, states=None):
+        """Returns the contributors matching each name, one row per (query, contributor).
+
+        A name with a first name ("Smith, John" or "John Smith") is matched on
+        the full cleaned name; a bare last name is matched on the last name
+        alone. states, if given, is one state per name (None for any state).
+        """
+        names = pd.Series(list(names), dtype=object)
+        clean_names = clean_names_vectorized(names)
+        states = _normalize_states(pd.Series(list(states) if states is not None else [None] * len(names), dtype=object))
+        full_name = clean_names.str.contains(',', regex=False)
+        query = pd.DataFrame({
+            'query_id': range(len(names)),
+            'clean_name': clean_names.where(full_name, None),
+            'last_name': clean_last_names(clean_names).where(~full_name, None),
+            'state': states,
+        })
+
+        self.connection.execute("DROP TABLE IF EXISTS temp.queries")
+        self.connection.execute("CREATE TEMP TABLE queries (query_id INTEGER, clean_name TEXT, last_name TEXT, state TEXT)")
+        self.connection.executemany(
+            "INSERT INTO temp.queries VALUES (?, ?, ?, ?)",
+            query.astype(object).where(query.notna(), None).itertuples(index=False, name=None),
+        )
+        columns = ', '.join(f"c.{column}" for column in INDEX_COLUMNS)
+        candidates = pd.read_sql_query(
+            f"""SELECT q.query_id, 'full' AS match, {columns}
+                FROM temp.queries q JOIN contributors c ON c.clean_name = q.clean_name
+                WHERE q.state IS NULL OR c.state = q.state
+                UNION ALL
+                SELECT q.query_id, 'last' AS match, {columns}
+                FROM temp.queries q JOIN contributors c ON c.last_name = q.last_name AND c.state = q.state
+                UNION ALL
+                SELECT q.query_id, 'last' AS match, {columns}
+                FROM temp.queries q JOIN contributors c ON c.last_name = q.last_name
+                WHERE q.state IS NULL""",
+            self.connection,
+        )
+        self.connection.execute("DROP TABLE temp.queries")
+        candidates.insert(0, 'query_name', names.to_numpy()[candidates['query_id'].to_numpy(dtype=int)])
+        return candidates.sort_values(['query_id', 'match', 'clean_name'], ignore_index=True)
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def judge_candidates(index_path, cf_path=CF_SCORES_PATH):
+    """Returns the DIME contributors sharing a last name and state with each judge in the CF scores file."""
+    judges = pd.read_csv(cf_path, usecols=['lastname', 'state', 'justice_code']).dropna(subset=['lastname'])
+    with ContributorIndex(index_path) as index:
+        candidates = index.candidates(judges['lastname'], judges['state'])
+    candidates.insert(1, 'justice_code', judges['justice_code'].to_numpy()[candidates['query_id'].to_numpy(dtype=int)])
+    found = candidates['query_id'].nunique()
+    print(f"{len(candidates)} candidate contributors for {found} of {len(judges)} judges")
+    return candidates
+
+
+if __name__ == "__main__":
+    index_path = 'dime_contributors.sqlite'
+    if not os.path.exists(index_path):
+        with ContributorIndex(index_path) as index:
+            index.build('dime_contributors_1979_2022.csv')
+    judge_candidates(index_path).to_csv('judge_contributor_candidates.csv', index=False)
@@ -0,0 +1,86 @@
+import csv
+import os
+
+
+class StreamingCSVWriter:
+    """Writes rows to a CSV as they are produced instead of collecting them first.
+
+    Rows go to <path>.partial, which is flushed to disk every flush_every rows,
+    and is renamed to path by close(). If the run dies part way, the rows
+    written so far are still in the .partial file and path is left untouched.
+    A run that writes no rows leaves path untouched too.
+    Keys that are not in fieldnames are dropped (and reported on close);
+    missing keys are written as ''.
+    """
+
+    def __init__(self, path, fieldnames, flush_every=100):
+        self.path = path
+        self.partial_path = f"{path}.partial"
+        self.fieldnames = list(fieldnames)
+        self.flush_every = flush_every
+        self.rows_written = 0
+        self.dropped_fields = set()
+        self.file = open(self.partial_path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, self.fieldnames, restval='', extrasaction='ignore')
+        self.writer.writeheader()
+
+    def writerow(self, row):
+        self.dropped_fields.update(key for key in row if key not in self.writer.fieldnames)
+        self.writer.writerow(row)
+        self.rows_written += 1
+        if self.rows_written % self.flush_every == 0:
+            self.flush()
+
+    def flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        """Flushes the remaining rows and atomically moves the file into place."""
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+        if not self.rows_written:
+            os.remove(self.partial_path)
+            return
+        os.replace(self.partial_path, self.path)
+        if self.dropped_fields:
+            print(f"Warning: columns not in the {os.path.basename(self.path)} schema were dropped: {sorted(self.dropped_fields)}")
+
+    def abort(self):
+        """Closes the file without replacing path; the .partial file keeps the rows written."""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+            print(f"Partial results kept in {self.partial_path} ({self.rows_written} rows)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def merge_csv_shards(shard_paths, output_path, flush_every=1000):
+    """Concatenates CSV shards into output_path one row at a time.
+
+    The output columns are the union of the shards' columns in order of first
+    appearance; a shard without a column gets '' for it. Returns the number
+    of rows written.
+    """
+    fieldnames = []
+    for shard_path in shard_paths:
+        with open(shard_path, newline='', encoding='utf-8') as file:
+            header = next(csv.reader(file), [])
+        fieldnames.extend(field for field in header if field not in fieldnames)
+
+    with StreamingCSVWriter(output_path, fieldnames, flush_every) as writer:
+        for shard_path in shard_paths:
+            with open(shard_path, newline='', encoding='utf-8') as file:
+                for row in csv.DictReader(file):
+                    writer.writerow(row)
+    return writer.rows_written
@@ -0,0 +1,99 @@
+import io
+import os
+import dask
+import pandas as pd
+from dask import delayed
+from bigcsvoutput import CONTRIBUTOR_DTYPES, CONTRIBUTOR_FIELDS, load_search_lookup, match_search_names
+
+# Scans dime_contributors_1979_2022.csv directly, without split.py's chunk
+# files: the file is cut into byte ranges, each range is parsed and matched
+# on its own core, and only the matching rows come back. A range owns every
+# line that starts inside it, so no line is read twice or lost. Quoted fields
+# with embedded newlines would be cut at a range boundary; DIME has none, and
+# a broken line is skipped like any other bad line.
+DIME_COLUMNS = CONTRIBUTOR_FIELDS
+DIME_DTYPES = CONTRIBUTOR_DTYPES
+MATCH_COLUMNS = DIME_COLUMNS + ['clean_name', 'matched_search_name']  # columns of the matches
+BLOCK_SIZE = 128 * 1024 * 1024
+
+
+def read_header(input_file):
+    """Returns (column names, byte offset of the first data line)."""
+    with open(input_file, 'rb') as file:
+        header = file.readline()
+    columns = pd.read_csv(io.BytesIO(header), nrows=0, encoding='latin-1').columns.tolist()
+    return columns, len(header)
+
+
+def byte_ranges(input_file, start, block_size=BLOCK_SIZE):
+    size = os.path.getsize(input_file)
+    return [(begin, min(begin + block_size, size)) for begin in range(start, size, block_size)]
+
+
+def read_block(input_file, begin, end):
+    """Returns the bytes of the whole lines that start in [begin, end)."""
+    with open(input_file, 'rb') as file:
+        # Skip the line begin falls in, unless begin is already a line start
+        file.seek(begin - 1)
+        file.readline()
+        position = file.tell()
+        if position >= end:
+            return b''
+        data = file.read(end - position)
+        if not data.endswith(b'\n'):
+            data += file.readline()
+    return data
+
+
+def parse_block(data, columns):
+    usecols = [column for column in DIME_COLUMNS if column in columns]
+    return pd.read_csv(
+        io.BytesIO(data), header=None, names=columns, usecols=usecols,
+        dtype={column: DIME_DTYPES[column] for column in usecols},
+        encoding='latin-1', on_bad_lines='skip', low_memory=False,
+    )
+
+
+def block_lines(data):
+    """Counts the lines of a read_block result, a last line without a newline included."""
+    if not data.strip():
+        return 0
+    return data.count(b'\n') + (not data.endswith(b'\n'))
+
+
+@delayed
+def scan_block(input_file, begin, end, columns, search_lookup):
+    """Returns (matching rows, lines in the block, rows parsed) for one byte range."""
+    data = read_block(input_file, begin, end)
+    lines = block_lines(data)
+    if not lines:
+        return pd.DataFrame(columns=MATCH_COLUMNS), 0, 0
+    chunk = parse_block(data, columns)
+    return match_search_names(chunk, search_lookup), lines, len(chunk)
+
+
+def scan_dime_file(input_file, search_names_path, output_csv='final_output.csv', block_size=BLOCK_SIZE, workers=None):
+    """Matches the search names against the DIME contributors file in parallel byte ranges; returns the matches."""
+    search_lookup = delayed(load_search_lookup(search_names_path), pure=True)
+    columns, data_start = read_header(input_file)
+    missing = [column for column in DIME_COLUMNS if column not in columns]
+    if missing:
+        print(f"Columns not in {input_file}: {', '.join(missing)}")
+
+    ranges = byte_ranges(input_file, data_start, block_size)
+    print(f"Scanning {input_file} in {len(ranges)} blocks...")
+    tasks = [scan_block(input_file, begin, end, columns, search_lookup) for begin, end in ranges]
+    results = dask.compute(*tasks, scheduler='processes', num_workers=workers)
+
+    lines = sum(result[1] for result in results)
+    parsed = sum(result[2] for result in results)
+    # A file with a header but no data lines has no blocks
+    final_result = pd.concat([result[0] for result in results], ignore_index=True) if results else pd.DataFrame(columns=MATCH_COLUMNS)
+    final_result.to_csv(output_csv, index=False)
+    print(f"Scanned {parsed} rows ({lines - parsed} bad lines skipped). Final results saved to {output_csv}")
+    print(f"Number of matches found: {len(final_result)}")
+    return final_result
+
+
+if __name__ == "__main__":
+    scan_dime_file('dime_contributors_1979_2022.csv', 'Names - Sheet7.csv')
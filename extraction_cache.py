@@ -0,0 +1,66 @@
+import hashlib
+import json
+import sqlite3
+
+
+def file_digest(path):
+    """Returns the SHA-256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """SQLite store of extracted fields keyed by RTF content hash.
+
+    Fields are stored per extractor group together with the version of the
+    extractor that produced them, so bumping one version in
+    MainCode.EXTRACTOR_VERSIONS only invalidates that group.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS field_groups (
+                digest TEXT NOT NULL,
+                field_group TEXT NOT NULL,
+                version TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (digest, field_group)
+            )"""
+        )
+        self.connection.commit()
+
+    def get(self, digest, versions):
+        """Returns {group: fields} for the groups cached at their current version."""
+        rows = self.connection.execute(
+            "SELECT field_group, version, data FROM field_groups WHERE digest = ?", (digest,)
+        )
+        return {
+            group: json.loads(data)
+            for group, version, data in rows
+            if versions.get(group) == version
+        }
+
+    def put(self, digest, versions, groups):
+        """Stores {group: fields} for one file under the given versions."""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO field_groups (digest, field_group, version, data) VALUES (?, ?, ?, ?)",
+            [(digest, group, versions[group], json.dumps(fields, default=str)) for group, fields in groups.items()],
+        )
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
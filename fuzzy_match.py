@@ -0,0 +1,165 @@
+import dask
+import pandas as pd
+from dask import delayed
+try:
+    from rapidfuzz.distance import JaroWinkler
+except ImportError:  # optional; fall back to the pure Python scorer below
+    JaroWinkler = None
+from JUDGE_CODES import JUDGE_CODES
+from bigcsvoutput import clean_last_names, clean_names_vectorized
+from dime_scan import BLOCK_SIZE, byte_ranges, parse_block, read_block, read_header
+from judge_resolver import normalize_names
+
+# Fuzzy judge-to-contributor matching. Contributors are blocked by state and
+# the first letter of each name word, and a word is only scored against the
+# judges of its block, so the work grows linearly with the contributor count.
+# Scoring is per distinct (state, word) rather than per row. A word that is
+# not the contributor's last name ("Hon John Smith" cleans to "hon, john
+# smith") is still scored, with a small penalty.
+MIN_SCORE = 0.9
+OTHER_WORD_PENALTY = 0.05
+CANDIDATE_FIELDS = [
+    'justice_code', 'judge_name', 'state', 'score', 'trigram_score', 'matched_word',
+    'bonica.cid', 'most.recent.contributor.name', 'clean_name',
+    'most.recent.contributor.employer', 'most.recent.contributor.zipcode',
+]
+
+
+def jaro_winkler(a, b, prefix_weight=0.1):
+    """Jaro-Winkler similarity of two strings, between 0 and 1."""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    window = max(max(len(a), len(b)) // 2 - 1, 0)
+    matched_b = [False] * len(b)
+    matches_a = []
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not matched_b[j] and b[j] == char:
+                matched_b[j] = True
+                matches_a.append(char)
+                break
+    if not matches_a:
+        return 0.0
+    matches_b = [char for char, matched in zip(b, matched_b) if matched]
+    transpositions = sum(x != y for x, y in zip(matches_a, matches_b)) / 2
+    m = len(matches_a)
+    jaro = (m / len(a) + m / len(b) + (m - transpositions) / m) / 3
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_weight * (1 - jaro)
+
+
+def name_similarity(a, b):
+    if JaroWinkler is not None:
+        return JaroWinkler.similarity(a, b)
+    return jaro_winkler(a, b)
+
+
+def trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_similarity(a, b):
+    """Jaccard similarity of the character trigrams of two words."""
+    a, b = trigrams(a), trigrams(b)
+    return len(a & b) / len(a | b)
+
+
+def judge_blocks(judge_codes=JUDGE_CODES):
+    """Returns {(state, first letter): [(normalized last name, justice code, last name)]}."""
+    blocks = {}
+    for state, names in judge_codes.items():
+        for name, code in names.items():
+            normalized = normalize_names(pd.Series([name])).iloc[0]
+            if normalized:
+                blocks.setdefault((state, normalized[0]), []).append((normalized, code, name))
+    return blocks
+
+
+def contributor_words(chunk):
+    """One row per contributor and name word: (row, state, word, is_last_name), words normalized as judge names are."""
+    clean_names = clean_names_vectorized(chunk['most.recent.contributor.name'])
+    states = chunk['most.recent.contributor.state'].astype('string').str.strip().str.upper()
+    # The whole last name (so "van horne" meets "Van Horne"), then every word of the name
+    rows = pd.RangeIndex(len(chunk))
+    last_names = pd.DataFrame({'row': rows, 'state': states.to_numpy(), 'word': clean_last_names(clean_names).to_numpy(), 'is_last_name': True})
+    words = pd.Series(clean_names.to_numpy(), index=rows).str.replace(',', ' ', regex=False).str.split().explode()
+    other_words = pd.DataFrame({'row': words.index, 'state': states.to_numpy()[words.index], 'word': words.to_numpy(), 'is_last_name': False})
+    words = pd.concat([last_names, other_words], ignore_index=True).dropna(subset=['word', 'state'])
+    words['word'] = normalize_names(words['word'])
+    words = words[words['word'].str.len() > 1]
+    # A word equal to the last name keeps only its last-name row
+    return words.sort_values('is_last_name', ascending=False).drop_duplicates(['row', 'word']), clean_names
+
+
+def score_words(words, blocks, min_score=MIN_SCORE):
+    """Scores each distinct (state, word) against the judges of its block; returns the pairs at or above min_score."""
+    scored = []
+    distinct = words[['state', 'word']].drop_duplicates()
+    for state, word in zip(distinct['state'], distinct['word']):
+        for judge_name, code, name in blocks.get((state, word[0]), ()):
+            score = name_similarity(word, judge_name)
+            if score >= min_score:
+                scored.append((state, word, code, name, score, trigram_similarity(word, judge_name)))
+    return pd.DataFrame(scored, columns=['state', 'word', 'justice_code', 'judge_name', 'score', 'trigram_score'])
+
+
+def match_chunk(chunk, blocks, min_score=MIN_SCORE):
+    """Returns the fuzzy judge candidates among one chunk of contributors, best word per (contributor, judge)."""
+    words, clean_names = contributor_words(chunk)
+    scores = score_words(words, blocks, min_score)
+    candidates = words.merge(scores, on=['state', 'word'])
+    candidates['score'] -= OTHER_WORD_PENALTY * ~candidates['is_last_name']
+    candidates = candidates[candidates['score'] >= min_score]
+    candidates = candidates.sort_values(['score', 'trigram_score'], ascending=False).drop_duplicates(['row', 'justice_code'])
+    rows = chunk.iloc[candidates['row'].to_numpy()].reset_index(drop=True)
+    rows['clean_name'] = clean_names.iloc[candidates['row'].to_numpy()].to_numpy()
+    for column in ['justice_code', 'judge_name', 'state', 'score', 'trigram_score']:
+        rows[column] = candidates[column].to_numpy()
+    rows['matched_word'] = candidates['word'].to_numpy()
+    return rows.reindex(columns=CANDIDATE_FIELDS)
+
+
+@delayed
+def match_block(input_file, begin, end, columns, blocks, min_score):
+    data = read_block(input_file, begin, end)
+    if not data.strip():
+        return pd.DataFrame(columns=CANDIDATE_FIELDS)
+    return match_chunk(parse_block(data, columns), blocks, min_score)
+
+
+def rank_candidates(candidates, top_n=None):
+    """Sorts candidates best first within each judge and numbers them; keeps the top_n per judge if given."""
+    candidates = candidates.sort_values(['justice_code', 'score', 'trigram_score'], ascending=[True, False, False], ignore_index=True)
+    candidates.insert(1, 'rank', candidates.groupby('justice_code').cumcount() + 1)
+    if top_n is not None:
+        candidates = candidates[candidates['rank'] <= top_n].reset_index(drop=True)
+    return candidates
+
+
+def fuzzy_match_judges(input_file, output_csv='judge_fuzzy_candidates.csv', min_score=MIN_SCORE, top_n=None, block_size=BLOCK_SIZE, workers=None, judge_codes=JUDGE_CODES):
+    """Ranks DIME contributors as candidates for each judge in JUDGE_CODES, scanning the contributors file on all cores."""
+    blocks = delayed(judge_blocks(judge_codes), pure=True)
+    columns, data_start = read_header(input_file)
+    ranges = byte_ranges(input_file, data_start, block_size)
+    print(f"Fuzzy matching judges against {input_file} in {len(ranges)} blocks...")
+    tasks = [match_block(input_file, begin, end, columns, blocks, min_score) for begin, end in ranges]
+    results = dask.compute(*tasks, scheduler='processes', num_workers=workers)
+
+    # A file with a header but no data lines has no blocks
+    candidates = pd.concat(results, ignore_index=True) if results else pd.DataFrame(columns=CANDIDATE_FIELDS)
+    candidates = rank_candidates(candidates, top_n)
+    candidates.to_csv(output_csv, index=False)
+    judges = sum(len(names) for names in judge_codes.values())
+    print(f"{len(candidates)} candidates for {candidates['justice_code'].nunique()} of {judges} judges saved to {output_csv}")
+    return candidates
+
+
+if __name__ == "__main__":
+    fuzzy_match_judges('dime_contributors_1979_2022.csv', top_n=50)
@@ -0,0 +1,224 @@
+import json
+import os
+from datetime import date
+from MainCode import (
+    CASE_FIELDS, ParsedCase, VOTE_FIELDS, _collect_outcome, extract_text_from_rtf,
+    field_group_confidence, field_group_dependencies, field_group_extractors, folder_state,
+)
+from chatgptoption import MODEL, request_completion
+from csv_stream import StreamingCSVWriter
+from prompt_sections import trim_case_text
+from response_cache import ResponseCache
+
+# Regex first: every field group is extracted by MainCode and scored with its
+# confidence; only groups below the threshold are asked of the LLM, with a
+# prompt listing just their variables.
+CONFIDENCE_THRESHOLD = 0.6
+HYBRID_PROMPT_VERSION = 1  # bump whenever hybrid_prompt_variables changes
+
+# Prompt variables per field group, worded as in chatgptoption's prompt
+hybrid_prompt_variables = {
+    'case_name': '''- "Title_P1": First party listed in the case title (string).
+    - "Title_P2": Second party listed in the case title (string).''',
+    'case_citation': '''- "LexisNexisCitation": Lexis Nexis-generated case identifier (string).''',
+    'parties': '''- "appellant": Name of the party bringing the appeal (string).
+    - "appellee": Name of the opposing party in the appeal (string).''',
+    'decision_date': '''- "Month": Month of the state supreme court decision (integer, 1-12).
+    - "Day": Day of the state supreme court decision (integer, 1-31).
+    - "Year": Year of the state supreme court decision (four-digit integer).''',
+    'disposition': '''- "Disposition": Numerical code for the supreme court's ruling on the lower court decision (integer). Use the following codes:
+        1 - Stay, petition, or motion granted
+        2 - Affirmed
+        3 - Reversed
+        4 - Reversed and remanded
+        5 - Vacated and remanded
+        6 - Affirmed and reversed (or vacated) in part
+        7 - Affirmed and reversed (or vacated) in part and remanded
+        8 - Vacated
+        9 - Petition denied or appeal dismissed
+        10 - Certification to a lower court
+        11 - No disposition
+        12 - Affirmed and remanded
+    - "court_decision": Integer indicating whether the decision favors the appellant (1), appellee (2), or is mixed/unknown (3).
+    - "outcome_text": Main outcome statement of the case (string).''',
+    'authors': '''- "opinion_author": Last name of the author of the majority opinion, or "PER CURIAM" (string).
+    - "concurring_authors": Last names of the authors of concurring opinions (list of strings).
+    - "dissent_authors": Last names of the authors of dissenting opinions (list of strings).''',
+    'votes': '''- "J1_Name": Last name of Judge 1 (string, without titles).
+    - "J1_Vote": Vote of Judge 1 (integer). Use the following codes:
+        0 - Minority Vote
+        1 - Majority Vote
+        2 - Recused
+        3 - Not Participating
+    - Continue similarly for "J2_Name", "J2_Vote" and so on, for every judge on the case.''',
+    'law_area': '''- "LegalArea": Lexis-Nexis issue area classification found from the first classification under "headnotes" (string, e.g., "Constitutional Law").''',
+    'prior_history': '''- "PriorHistory": Text of where the case is being appealed from (string).''',
+}
+
+# The prompt's Disposition and court_decision codes -> MainCode's
+llm_disposition_codes = {1: 1, 2: 2, 3: 3, 4: 4, 5: 5, 6: 6, 7: 8, 8: 10, 9: 11, 10: 12, 11: 13, 12: 14}
+llm_court_decisions = {1: 2, 2: 1, 3: 3}
+# J*_Vote codes -> MainCode's vote_mapping codes
+llm_vote_codes = {0: 1, 1: 2, 2: 4, 3: 5}
+
+HYBRID_FIELDS = CASE_FIELDS + [f"{group}_confidence" for group in field_group_extractors] + ['llm_groups']
+
+
+def build_hybrid_prompt(text, groups):
+    """Builds an extraction prompt asking only for the variables of the given field groups."""
+    variables = '\n    '.join(hybrid_prompt_variables[group] for group in groups)
+    return f"""
+    Please extract the following variables from the provided legal case text. Format the output as JSON with each variable as a key. Use the provided codes where applicable.
+
+    {variables}
+
+    Text:
+    {text}
+
+    Please return these variables exactly as specified in JSON format.
+    """
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _override(case, **values):
+    # Replaces ParsedCase properties and drops the ones derived from them
+    for derived in ('votes_original', 'votes_appellant_appellee', 'justice_info'):
+        case.__dict__.pop(derived, None)
+    case.__dict__.update(values)
+
+
+def apply_case_name(case, fields, answer):
+    if answer.get('Title_P1') and answer.get('Title_P2'):
+        return {'case_name': f"{answer['Title_P1']} v. {answer['Title_P2']}"}
+    return fields
+
+def apply_case_citation(case, fields, answer):
+    return {'case_citation': answer.get('LexisNexisCitation') or fields['case_citation']}
+
+def apply_parties(case, fields, answer):
+    return {'appellant': answer.get('appellant') or fields['appellant'], 'appellee': answer.get('appellee') or fields['appellee']}
+
+def apply_decision_date(case, fields, answer):
+    try:
+        return {'decision_date': date(int(answer['Year']), int(answer['Month']), int(answer['Day']))}
+    except (KeyError, TypeError, ValueError):
+        return fields
+
+def apply_disposition(case, fields, answer):
+    disposition_code = llm_disposition_codes.get(_int(answer.get('Disposition')), fields['disposition_code'])
+    court_decision = llm_court_decisions.get(_int(answer.get('court_decision')), fields['court_decision'])
+    _override(case, disposition=(disposition_code, court_decision, answer.get('outcome_text') or fields['outcome_text']))
+    return field_group_extractors['disposition'](case)
+
+def apply_authors(case, fields, answer):
+    return {
+        'opinion_author': answer.get('opinion_author') or fields['opinion_author'],
+        'concurring_authors': answer.get('concurring_authors') or fields['concurring_authors'],
+        'dissent_authors': answer.get('dissent_authors') or fields['dissent_authors'],
+    }
+
+def apply_votes(case, fields, answer):
+    votes_original = {}
+    i = 1
+    while answer.get(f"J{i}_Name"):
+        votes_original[answer[f"J{i}_Name"].strip().upper()] = llm_vote_codes.get(_int(answer.get(f"J{i}_Vote")), 2)
+        i += 1
+    if not votes_original:
+        return fields
+    _override(case, justices=list(votes_original), votes_original=votes_original)
+    return field_group_extractors['votes'](case)
+
+def apply_law_area(case, fields, answer):
+    return {'law_area': answer.get('LegalArea') or fields['law_area']}
+
+def apply_prior_history(case, fields, answer):
+    return {'prior_history': answer.get('PriorHistory') or fields['prior_history']}
+
+# Turns the LLM's answer for a group into that group's MainCode fields,
+# keeping the regex value for anything the answer leaves out
+apply_llm_answer = {
+    'case_name': apply_case_name,
+    'case_citation': apply_case_citation,
+    'parties': apply_parties,
+    'decision_date': apply_decision_date,
+    'disposition': apply_disposition,
+    'authors': apply_authors,
+    'votes': apply_votes,
+    'law_area': apply_law_area,
+    'prior_history': apply_prior_history,
+}
+
+
+def extract_hybrid(file_path, threshold=CONFIDENCE_THRESHOLD, response_cache=None):
+    """Returns (groups, llm_groups) for one RTF: MainCode's field groups, with the low-confidence ones answered by the LLM."""
+    case = ParsedCase(extract_text_from_rtf(file_path))
+    groups = {group: extractor(case) for group, extractor in field_group_extractors.items()}
+    confidence = {group: field_group_confidence[group](case, fields) for group, fields in groups.items()}
+    llm_groups = [group for group in groups if confidence[group] < threshold]
+
+    if llm_groups:
+        prompt = build_hybrid_prompt(trim_case_text(case.text), llm_groups)
+        response = response_cache.get(prompt, MODEL, HYBRID_PROMPT_VERSION) if response_cache is not None else None
+        if response is None:
+            response = request_completion(prompt)
+            if response_cache is not None:
+                response_cache.put(prompt, MODEL, HYBRID_PROMPT_VERSION, response)
+        answer = json.loads(response)
+        for group in llm_groups:
+            groups[group] = apply_llm_answer[group](case, groups[group], answer)
+        # Regex groups built on an answered group are rebuilt from the answer
+        for group, dependencies in field_group_dependencies.items():
+            if group not in llm_groups and any(dependency in llm_groups for dependency in dependencies):
+                groups[group] = field_group_extractors[group](case)
+
+    groups['confidence'] = {
+        **{f"{group}_confidence": value for group, value in confidence.items()},
+        'llm_groups': ' '.join(llm_groups),
+    }
+    return groups, llm_groups
+
+
+def process_rtf_folder_hybrid(folder_path, output_csv, threshold=CONFIDENCE_THRESHOLD, cache_path=None, votes_output=None, state=None):
+    """Like MainCode.process_rtf_folder, but fields the regexes are unsure of are filled in by the LLM."""
+    state = state or folder_state(folder_path)
+    rtf_files = [f for f in os.listdir(folder_path) if f.lower().endswith('.rtf')]
+    print(f"Found {len(rtf_files)} RTF files.")
+    response_cache = ResponseCache(cache_path) if cache_path else None
+    processed = llm_cases = llm_group_count = 0
+
+    votes_writer = StreamingCSVWriter(votes_output, VOTE_FIELDS) if votes_output else None
+    try:
+        with StreamingCSVWriter(output_csv, HYBRID_FIELDS) as writer:
+            for filename in rtf_files:
+                print(f"Processing file: {filename}")
+                try:
+                    groups, llm_groups = extract_hybrid(os.path.join(folder_path, filename), threshold, response_cache)
+                    outcome = (groups, None, None)
+                except Exception as e:
+                    import traceback
+                    outcome, llm_groups = (None, str(e), traceback.format_exc()), []
+                processed += _collect_outcome(filename, outcome, writer, votes_writer, state=state)
+                llm_cases += bool(llm_groups)
+                llm_group_count += len(llm_groups)
+        if votes_writer:
+            votes_writer.close()
+    finally:
+        if votes_writer:
+            votes_writer.abort()
+        if response_cache is not None:
+            response_cache.report()
+            response_cache.close()
+
+    print(f"Finished processing. Successfully processed {processed} out of {len(rtf_files)} files.")
+    print(f"{llm_cases} cases needed the LLM for {llm_group_count} field groups; {processed - llm_cases} were handled by regex alone.")
+
+
+if __name__ == "__main__":
+    folder_path = '/path/to/States/AZ'  # Replace with the path to a state folder
+    process_rtf_folder_hybrid(folder_path, 'output_results_hybrid.csv', cache_path='llm_responses.sqlite')
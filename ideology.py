@@ -0,0 +1,122 @@
+import warnings
+import numpy as np
+import pandas as pd
+from case_votes import votes_from_wide
+from judge_resolver import build_judge_index, resolve_votes
+
+# outcome_direction uses the outcome_ideology coding: 1 liberal, 2 conservative.
+# CF scores run from liberal (negative) to conservative (positive). The
+# direction comes from where the majority sits relative to the dissenters, so
+# it is NA for every unanimous case; the disposition alone does not say which
+# way a ruling leans.
+LIBERAL = 1
+CONSERVATIVE = 2
+
+IDEOLOGY_FIELDS = ['outcome_direction', 'median_cf', 'majority_cf', 'dissent_cf']
+
+MAJORITY = 1  # case_votes vote codes
+MINORITY = 0
+
+
+def cf_array(cf_scores):
+    """Dense float array of cf_score indexed by justice code (NaN for unknown codes)."""
+    codes = np.asarray(cf_scores.index, dtype='int64')
+    scores = np.full(codes.max() + 1 if len(codes) else 1, np.nan)
+    scores[codes] = np.asarray(cf_scores, dtype='float64')
+    return scores
+
+
+def vote_matrix(votes, case_ids):
+    """Scatters the long case_votes table into (judge_code, vote) matrices of shape (cases, seats).
+
+    Row i holds the justices of case_ids[i]; missing seats are -1 in both.
+    """
+    case_ids = np.asarray(case_ids)
+    if len(case_ids) == 0:
+        return np.full((0, 0), -1, dtype='int64'), np.full((0, 0), -1, dtype='int8')
+    order = np.argsort(case_ids, kind='stable')
+    rows = np.searchsorted(case_ids, votes['case_id'].to_numpy(dtype='int64'), sorter=order)
+    rows = order[np.minimum(rows, len(case_ids) - 1)]
+    keep = case_ids[rows] == votes['case_id'].to_numpy(dtype='int64')
+    seats = votes['seat'].to_numpy(dtype='int64')
+    width = int(seats.max()) if len(seats) else 0
+
+    codes = np.full((len(case_ids), width), -1, dtype='int64')
+    vote = np.full((len(case_ids), width), -1, dtype='int8')
+    rows, seats = rows[keep], seats[keep] - 1
+    codes[rows, seats] = votes['judge_code'].to_numpy(dtype='float64', na_value=-1)[keep].astype('int64')
+    vote[rows, seats] = votes['vote'].to_numpy(dtype='float64', na_value=-1)[keep].astype('int8')
+    return codes, vote
+
+
+def _masked_mean(scores, mask):
+    counts = mask.sum(axis=1)
+    totals = np.where(mask, scores, 0.0).sum(axis=1)
+    means = np.full(len(scores), np.nan)
+    np.divide(totals, counts, out=means, where=counts > 0)
+    return means
+
+
+def compute_ideology(codes, vote, scores):
+    """Computes IDEOLOGY_FIELDS for every case at once from vote_matrix output and a cf_array.
+
+    median_cf is the median score of the justices who took part (majority
+    or minority), majority_cf and dissent_cf the mean score of each
+    coalition, counting only justices with a score. outcome_direction is
+    liberal when the majority sits left of the dissenters and conservative
+    when it sits right; unanimous cases and cases without scored dissenters
+    have no direction.
+    """
+    known = (codes >= 0) & (codes < len(scores))
+    justice_cf = np.where(known, scores[np.where(known, codes, 0)], np.nan)
+    scored = ~np.isnan(justice_cf)
+    majority = scored & (vote == MAJORITY)
+    dissent = scored & (vote == MINORITY)
+
+    participating = np.where(majority | dissent, justice_cf, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN rows
+        median_cf = np.nanmedian(participating, axis=1) if participating.shape[1] else np.full(len(codes), np.nan)
+    majority_cf = _masked_mean(justice_cf, majority)
+    dissent_cf = _masked_mean(justice_cf, dissent)
+
+    direction = pd.array(np.full(len(codes), pd.NA), dtype='Int8')
+    direction[majority_cf < dissent_cf] = LIBERAL
+    direction[majority_cf > dissent_cf] = CONSERVATIVE
+    return pd.DataFrame({
+        'outcome_direction': direction,
+        'median_cf': median_cf,
+        'majority_cf': majority_cf,
+        'dissent_cf': dissent_cf,
+    })
+
+
+def add_ideology(cases, votes=None, index=None):
+    """Returns cases with IDEOLOGY_FIELDS added.
+
+    votes is the case_votes table for these cases (case_id being the row
+    position unless cases has a case_id column); by default it is built from
+    the wide J* columns. MainCode's case CSV only has the appellant/appellee
+    vote there, so for its output pass the votes_output table of
+    process_rtf_folder; a vote table without majority/minority votes raises
+    ValueError. Missing judge codes are resolved by name first.
+    outcome_direction is NA for unanimous cases.
+    """
+    index = index if index is not None else build_judge_index()
+    if votes is None:
+        votes = votes_from_wide(cases)
+    if len(votes) and votes['vote'].isna().all():
+        raise ValueError("The vote table has no majority/minority votes; for MainCode output pass its case_votes table as votes")
+    votes = resolve_votes(votes, index=index)
+    case_ids = cases['case_id'].to_numpy() if 'case_id' in cases.columns else np.arange(len(cases))
+    codes, vote = vote_matrix(votes, case_ids)
+    ideology = compute_ideology(codes, vote, cf_array(index[1]))
+    ideology.index = cases.index
+    return pd.concat([cases.drop(columns=IDEOLOGY_FIELDS, errors='ignore'), ideology], axis=1)
+
+
+if __name__ == "__main__":
+    csv_path = 'combined_output_all_runs.csv'
+    output_path = csv_path.replace('.csv', '_ideology.csv')
+    add_ideology(pd.read_csv(csv_path, low_memory=False)).to_csv(output_path, index=False)
+    print(f"Wrote {output_path}")
@@ -0,0 +1,133 @@
+import re
+import numpy as np
+import pandas as pd
+from JUDGE_CODES import JUDGE_CODES
+from case_votes import wide_vote_columns
+
+CF_SCORES_PATH = 'Names - Last Name with CF.csv'
+
+
+def normalize_names(names):
+    """Lowercases names and strips accents and anything but letters (Muñiz -> muniz, D'Auria -> dauria)."""
+    return (
+        names.astype('string')
+        .str.normalize('NFKD')
+        .str.encode('ascii', errors='ignore')
+        .str.decode('ascii')
+        .str.lower()
+        .str.replace(r'[^a-z]', '', regex=True)
+    )
+
+
+def _last_names(names):
+    # "Ann Walsh Bradley" -> "Bradley", "Smith Jr." -> "Smith"
+    parts = names.astype('string').str.replace(r'[,\s]+(jr|sr|ii|iii|iv)\.?\s*$', '', regex=True, flags=re.IGNORECASE)
+    return parts.str.split().str[-1]
+
+
+def build_judge_index(judge_codes=JUDGE_CODES, cf_path=CF_SCORES_PATH):
+    """Returns (codes, cf_scores): 'STATE|lastname' -> justice code, and justice code -> cf_score.
+
+    The state is part of the key, so same-name justices on different courts
+    (McDonald in CT and IA) get their own codes.
+    """
+    entries = pd.DataFrame(
+        [(state, name, code) for state, names in judge_codes.items() for name, code in names.items()],
+        columns=['state', 'name', 'code'],
+    )
+    keys = entries['state'] + '|' + normalize_names(entries['name'])
+    codes = pd.Series(entries['code'].to_numpy(), index=keys.to_numpy())
+    cf = pd.read_csv(cf_path, usecols=['justice_code', 'cf_score']).dropna(subset=['justice_code'])
+    cf_scores = cf.drop_duplicates('justice_code').set_index(cf['justice_code'].drop_duplicates().astype(int))['cf_score']
+    return codes, cf_scores
+
+
+def _companion_column(name_column, suffix):
+    # J1_Name -> J1_Code / J1_CF, j1_name -> j1_code / j1_cf
+    prefix = name_column[:-len('name')]
+    return prefix + (suffix if name_column[-4:] == 'Name' else suffix.lower())
+
+
+def _factorize_clean(values, clean):
+    # factorize on the raw values, then clean only the distinct ones;
+    # values that clean to '' count as missing (-1)
+    ids, uniques = pd.factorize(values)
+    cleaned = clean(pd.Series(uniques, dtype='string')).fillna('')
+    cleaned_ids, cleaned_values = pd.factorize(cleaned.replace('', pd.NA))
+    return np.append(cleaned_ids, -1)[ids], cleaned_values
+
+
+def _lookup_codes(states, names, codes):
+    # Justice code for each (state, name) pair, looked up once per distinct pair:
+    # first on the whole name, then on its last word ("Jon J. Jensen" -> jensen).
+    # names can hold several seats back to back, each lined up with states.
+    # Also returns which entries had a name at all.
+    state_ids, state_values = _factorize_clean(states, lambda values: values.str.strip().str.upper())
+    state_ids = np.tile(state_ids, len(names) // max(len(states), 1))
+    name_ids, name_values = _factorize_clean(names, lambda values: values.str.strip())
+    # Missing states and names are -1, so shift both ids to start at 1
+    width = len(name_values) + 1
+    pair_ids, pairs = pd.factorize((state_ids.astype('int64') + 1) * width + name_ids + 1)
+    pair_states, pair_names = pairs // width - 1, pairs % width - 1
+    known = (pair_states >= 0) & (pair_names >= 0)
+
+    prefix = pd.Series(np.asarray(state_values, dtype=object)[pair_states[known]], dtype='string') + '|'
+    names = pd.Series(np.asarray(name_values, dtype=object)[pair_names[known]], dtype='string')
+    found = (prefix + normalize_names(names)).map(codes)
+    found = found.fillna((prefix + normalize_names(_last_names(names))).map(codes))
+
+    pair_codes = np.full(len(pairs), np.nan)
+    pair_codes[known] = found.to_numpy(dtype='float64', na_value=np.nan)
+    return pair_codes[pair_ids], name_ids >= 0
+
+
+def resolve_judges(cases, state=None, index=None):
+    """Fills every J*_Code from J*_Name and adds a J*_CF column with each justice's cf_score.
+
+    cases is a wide case table (combined or MainCode schema). Codes already
+    in the table are kept; only missing ones are looked up, using the row's
+    state column or the state argument. All seats are resolved together and
+    each distinct (state, name) pair is normalized and looked up once.
+    """
+    codes, cf_scores = index if index is not None else build_judge_index()
+    resolved = cases.copy()
+    states = np.full(len(cases), state, dtype=object) if state else cases['state'].to_numpy(dtype=object)
+
+    seats = [fields for fields in wide_vote_columns(cases.columns).values() if 'name' in fields]
+    if not seats:
+        return resolved
+    names = np.concatenate([cases[fields['name']].to_numpy(dtype=object) for fields in seats])
+    found, named = _lookup_codes(states, names, codes)
+    found, named = found.reshape(len(seats), len(cases)), named.reshape(len(seats), len(cases))
+
+    unresolved = 0
+    for seat, fields in enumerate(seats):
+        code_column = fields.get('code', _companion_column(fields['name'], 'Code'))
+        existing = pd.to_numeric(resolved[code_column], errors='coerce') if code_column in resolved.columns else pd.Series(np.nan, index=cases.index)
+        seat_codes = existing.fillna(pd.Series(found[seat], index=cases.index)).astype('Int16')
+        resolved[code_column] = seat_codes
+        resolved[_companion_column(fields['name'], 'CF')] = seat_codes.map(cf_scores).astype('Float32')
+        unresolved += int((named[seat] & seat_codes.isna().to_numpy()).sum())
+
+    if unresolved:
+        print(f"{unresolved} named justices could not be matched to a code")
+    return resolved
+
+
+def resolve_votes(votes, state=None, index=None):
+    """Same as resolve_judges for the long case_votes table; adds a cf_score column."""
+    codes, cf_scores = index if index is not None else build_judge_index()
+    resolved = votes.copy()
+    states = np.full(len(votes), state, dtype=object) if state else votes['state'].to_numpy(dtype=object)
+    found, _ = _lookup_codes(states, votes['judge_name'].to_numpy(dtype=object), codes)
+    found = pd.Series(found, index=votes.index)
+    resolved['judge_code'] = pd.to_numeric(resolved['judge_code'], errors='coerce').fillna(found).astype('Int16')
+    resolved['cf_score'] = resolved['judge_code'].map(cf_scores).astype('Float32')
+    return resolved
+
+
+if __name__ == "__main__":
+    csv_path = 'combined_output_all_runs.csv'
+    output_path = csv_path.replace('.csv', '_coded.csv')
+    resolve_judges(pd.read_csv(csv_path, low_memory=False)).to_csv(output_path, index=False)
+    print(f"Wrote {output_path}")
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import os
+import random
+import time
+import aiohttp
+import openai
+from chatgptoption import (
+    API_FIELDS, MAX_COMPLETION_TOKENS, MODEL, PROMPT_VERSION, build_extraction_prompt, extract_text_from_rtf,
+    merge_state_outputs,
+)
+from csv_stream import StreamingCSVWriter
+from prompt_sections import count_tokens, trim_case_text
+from response_cache import ResponseCache
+
+# Errors worth retrying: rate limits, 5xx responses and dropped connections
+RETRYABLE_ERRORS = (
+    openai.error.RateLimitError,
+    openai.error.ServiceUnavailableError,
+    openai.error.APIConnectionError,
+    openai.error.Timeout,
+    openai.error.TryAgain,
+)
+
+
+class TokenBucket:
+    """Allows up to capacity units per minute, refilled continuously."""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.rate = per_minute / 60
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until amount units are available (0 if they are now)."""
+        self._refill()
+        # A request bigger than the bucket waits for a full bucket instead of forever
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits shared by all requests.
+
+    Either limit can be None. Callers are served in arrival order, so one
+    large request is not starved by a stream of small ones.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.buckets = [
+            (TokenBucket(limit), use_tokens)
+            for limit, use_tokens in ((requests_per_minute, False), (tokens_per_minute, True))
+            if limit
+        ]
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, tokens):
+        async with self.lock:
+            while True:
+                delay = max((bucket.wait_time(tokens if use_tokens else 1) for bucket, use_tokens in self.buckets), default=0)
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            for bucket, use_tokens in self.buckets:
+                bucket.take(tokens if use_tokens else 1)
+
+
+def _retry_delay(error, attempt, base_delay):
+    retry_after = (getattr(error, 'headers', None) or {}).get('retry-after')
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return base_delay * 2 ** attempt * random.uniform(0.5, 1.0)
+
+
+def _is_retryable(error):
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    status = getattr(error, 'http_status', None)
+    return isinstance(error, openai.error.APIError) and status is not None and status >= 500
+
+
+async def aextract_variables_via_api(text, limiter=None, response_cache=None, max_retries=6, base_delay=1.0, prompt_tokens=None):
+    """Async version of extract_variables_via_api with rate limiting and exponential backoff.
+
+    prompt_tokens, the token count of the prompt, is counted here unless the caller has it already.
+    """
+    if response_cache is not None:
+        cached = response_cache.get(text, MODEL, PROMPT_VERSION)
+        if cached is not None:
+            return cached
+    prompt = build_extraction_prompt(text)
+    if prompt_tokens is None:
+        prompt_tokens = count_tokens(prompt, MODEL)
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            await limiter.acquire(prompt_tokens + MAX_COMPLETION_TOKENS)
+        try:
+            response = await openai.Completion.acreate(
+                model=MODEL,
+                prompt=prompt,
+                max_tokens=MAX_COMPLETION_TOKENS
+            )
+            extracted_data = response.choices[0].text.strip()
+            if response_cache is not None:
+                response_cache.put(text, MODEL, PROMPT_VERSION, extracted_data)
+            return extracted_data
+        except openai.error.OpenAIError as e:
+            if attempt == max_retries or not _is_retryable(e):
+                raise
+            delay = _retry_delay(e, attempt, base_delay)
+            print(f"Retrying in {delay:.1f}s after error: {e}")
+            await asyncio.sleep(delay)
+
+
+async def aprocess_rtf_file_with_api(file_path, limiter=None, response_cache=None):
+    text = trim_case_text(await asyncio.to_thread(extract_text_from_rtf, file_path))
+    prompt_tokens = count_tokens(build_extraction_prompt(text), MODEL)
+    extracted_data = await aextract_variables_via_api(text, limiter, response_cache, prompt_tokens=prompt_tokens)
+    extracted_dict = json.loads(extracted_data)
+    extracted_dict['prompt_tokens'] = prompt_tokens
+    return extracted_dict
+
+
+async def aprocess_state_folder(state_folder_path, state_code, concurrency=8, limiter=None, response_cache=None):
+    """Async process_state_folder: up to concurrency requests in flight, rows written in file order as in process_state_folder."""
+    rtf_files = [f for f in os.listdir(state_folder_path) if f.lower().endswith('.rtf')]
+    print(f"Processing state folder for {state_code}: Found {len(rtf_files)} RTF files.")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def process(filename):
+        async with semaphore:
+            try:
+                return filename, await aprocess_rtf_file_with_api(os.path.join(state_folder_path, filename), limiter, response_cache), None
+            except Exception as e:
+                return filename, None, e
+
+    state_output_file = f"output_{state_code}.csv"
+    with StreamingCSVWriter(state_output_file, API_FIELDS) as state_writer:
+        # Requests still finish in any order; a row waits only for the rows before it
+        for task in [asyncio.ensure_future(process(filename)) for filename in rtf_files]:
+            filename, result, error = await task
+            if error is not None:
+                print(f"Error processing {filename}: {str(error)}")
+                continue
+            state_writer.writerow(result)
+            print(f"Successfully processed file: {filename}")
+
+    if state_writer.rows_written:
+        print(f"Results for {state_code} saved to {state_output_file}")
+    return state_writer.rows_written
+
+
+async def aprocess_all_states(base_folder, parquet_output=None, concurrency=8, requests_per_minute=None, tokens_per_minute=None, cache_path=None, offline=False):
+    """Async process_all_states: state CSVs merged into the combined CSV the same way; the concurrency and rate limits apply across all states."""
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    response_cache = ResponseCache(cache_path, offline) if cache_path else None
+
+    outcomes = []
+    # One pooled session for all requests instead of a new connection per call
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        openai.aiosession.set(session)
+        for state_code in sorted(os.listdir(base_folder)):
+            state_folder_path = os.path.join(base_folder, state_code)
+            if os.path.isdir(state_folder_path) and len(state_code) == 2:
+                print(f"Starting processing for state: {state_code}")
+                try:
+                    rows = await aprocess_state_folder(state_folder_path, state_code, concurrency, limiter, response_cache)
+                    outcomes.append((state_code, rows, None))
+                except Exception as e:
+                    outcomes.append((state_code, 0, str(e)))
+
+    if response_cache is not None:
+        response_cache.report()
+        response_cache.close()
+    merge_state_outputs(outcomes, parquet_output)
+
+
+def process_all_states_async(base_folder, parquet_output=None, concurrency=8, requests_per_minute=None, tokens_per_minute=None, cache_path=None, offline=False):
+    asyncio.run(aprocess_all_states(base_folder, parquet_output, concurrency, requests_per_minute, tokens_per_minute, cache_path, offline))
+
+
+if __name__ == "__main__":
+    # Point openai.api_base at a local stub server to try this without the real API
+    base_folder = '/path/to/States'  # Replace with the path to your "States" folder
+    process_all_states_async(base_folder, concurrency=16, requests_per_minute=500, tokens_per_minute=150_000)
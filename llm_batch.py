@@ -0,0 +1,126 @@
+import json
+import os
+import sys
+from chatgptoption import (
+    MAX_COMPLETION_TOKENS, MODEL, PROMPT_VERSION, build_extraction_prompt, extract_text_from_rtf,
+    process_all_states,
+)
+from prompt_sections import trim_case_text
+from response_cache import ResponseCache, ResponseCacheMiss
+
+# Batch mode: write one request per RTF to a JSONL file, submit it as a batch
+# job, then ingest the results file into the response cache. The CSVs are
+# built from the cache by an offline process_all_states run, so ingestion can
+# be repeated as partial result files arrive. PROMPT_VERSION must not change
+# between writing the requests and ingesting the results.
+
+
+def custom_id(state_code, filename):
+    return f"{state_code}/{filename}"
+
+
+def _state_rtf_files(base_folder):
+    for state_code in sorted(os.listdir(base_folder)):
+        state_folder_path = os.path.join(base_folder, state_code)
+        if os.path.isdir(state_folder_path) and len(state_code) == 2:
+            for filename in sorted(os.listdir(state_folder_path)):
+                if filename.lower().endswith('.rtf'):
+                    yield state_code, filename, os.path.join(state_folder_path, filename)
+
+
+def _case_text(file_path):
+    return trim_case_text(extract_text_from_rtf(file_path))
+
+
+def write_batch_requests(base_folder, requests_path, cache_path=None):
+    """Writes a batch request JSONL with one completion request per RTF, skipping cases already in the response cache."""
+    written = skipped = 0
+    response_cache = ResponseCache(cache_path, offline=True) if cache_path else None
+    with open(requests_path, 'w', encoding='utf-8') as file:
+        for state_code, filename, file_path in _state_rtf_files(base_folder):
+            text = _case_text(file_path)
+            if response_cache is not None:
+                try:
+                    response_cache.get(text, MODEL, PROMPT_VERSION)
+                    skipped += 1
+                    continue
+                except ResponseCacheMiss:
+                    pass
+            request = {
+                'custom_id': custom_id(state_code, filename),
+                'method': 'POST',
+                'url': '/v1/completions',
+                'body': {'model': MODEL, 'prompt': build_extraction_prompt(text), 'max_tokens': MAX_COMPLETION_TOKENS},
+            }
+            file.write(json.dumps(request) + '\n')
+            written += 1
+    if response_cache is not None:
+        response_cache.close()
+    print(f"Wrote {written} requests to {requests_path} ({skipped} already cached)")
+    return written
+
+
+def _response_text(result):
+    # Returns the completion text of one result line, or None for failed requests
+    response = result.get('response') or {}
+    if result.get('error') or response.get('status_code', 200) != 200:
+        return None
+    choices = (response.get('body') or {}).get('choices') or []
+    return choices[0]['text'].strip() if choices else None
+
+
+def ingest_batch_results(results_path, base_folder, cache_path):
+    """Stores the responses of a batch results JSONL in the response cache, matched to the RTFs by custom_id.
+
+    Safe to run again on the same or a longer results file; a truncated last
+    line (a file still being downloaded), lines without a custom_id (such as
+    batch-level error lines) and repeated custom_ids are skipped.
+    """
+    ingested = failed = unknown = duplicates = 0
+    seen = set()
+    with ResponseCache(cache_path) as response_cache, open(results_path, encoding='utf-8') as file:
+        for line in file:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            request_id = result.get('custom_id') if isinstance(result, dict) else None
+            if not request_id:
+                print(f"Skipping a result line without custom_id: {line.strip()[:200]}")
+                unknown += 1
+                continue
+            if request_id in seen:
+                duplicates += 1
+                continue
+            state_code, _, filename = request_id.partition('/')
+            file_path = os.path.join(base_folder, state_code, filename)
+            if not os.path.exists(file_path):
+                print(f"No RTF for {request_id}")
+                unknown += 1
+                continue
+            text = _response_text(result)
+            if text is None:
+                print(f"Request {request_id} failed: {result.get('error') or (result.get('response') or {}).get('status_code')}")
+                failed += 1
+                continue
+            response_cache.put(_case_text(file_path), MODEL, PROMPT_VERSION, text)
+            seen.add(request_id)
+            ingested += 1
+    print(f"Ingested {ingested} responses from {results_path} ({failed} failed, {unknown} unmatched, {duplicates} duplicates)")
+    return ingested
+
+
+def build_outputs_from_batch(base_folder, cache_path, parquet_output=None):
+    """Builds the per-state and combined CSVs from ingested responses; cases without one are reported and left out."""
+    process_all_states(base_folder, parquet_output, cache_path, offline=True)
+
+
+if __name__ == "__main__":
+    base_folder = '/path/to/States'  # Replace with the path to your "States" folder
+    cache_path = 'llm_responses.sqlite'
+    step = sys.argv[1] if len(sys.argv) > 1 else 'write'
+    if step == 'write':
+        write_batch_requests(base_folder, 'batch_requests.jsonl', cache_path)
+    elif step == 'ingest':
+        ingest_batch_results(sys.argv[2], base_folder, cache_path)
+        build_outputs_from_batch(base_folder, cache_path)
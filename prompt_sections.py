@@ -0,0 +1,78 @@
+import re
+
+try:
+    import tiktoken
+except ImportError:  # optional; fall back to a character estimate
+    tiktoken = None
+
+# Section headings of the Lexis case layout, each on a line of its own
+section_heading_pattern = re.compile(
+    r'^(?:Prior History|Subsequent History|Disposition|Core Terms|Case Summary|Procedural Posture|Overview'
+    r'|Outcome|(?:LexisNexis®? )?Headnotes|Syllabus|Counsel:|Judges:|Opinion by:|Opinion|Concur by:|Dissent by:)',
+    re.MULTILINE | re.IGNORECASE,
+)
+# Paragraph sections the prompt needs, with the most characters kept of each
+paragraph_sections = [
+    ('Prior History', 1500),
+    ('Procedural Posture', 1500),
+    ('Outcome', 1000),
+    ('Judges:', 2000),
+]
+headnotes_pattern = re.compile(r'^(?:LexisNexis®? )?Headnotes[^\n]*\n?[^\n]*', re.MULTILINE | re.IGNORECASE)
+author_line_pattern = re.compile(r'^(?:Opinion by|Concur by|Dissent by):[^\n]*|^PER CURIAM\b[^\n]*', re.MULTILINE | re.IGNORECASE)
+# Short separate-opinion lines in the body, e.g. "JUSTICE MONTGOMERY, dissenting."
+separate_opinion_pattern = re.compile(
+    r'^[^\n]{0,120}\b(?:dissenting|concurring|specially concurring|dissents|concurs|recused|not participating)\b[^\n]{0,80}$',
+    re.MULTILINE | re.IGNORECASE,
+)
+MAX_HEADER = 1500
+MAX_SEPARATE_OPINION_LINES = 20
+
+
+def _paragraph(text, heading, limit):
+    match = re.search(rf'^{re.escape(heading)}[^\n]*\n?([\s\S]*?)(?:\n\s*\n|\Z)', text, re.MULTILINE | re.IGNORECASE)
+    if not match:
+        return None
+    return match.group(0).strip()[:limit]
+
+
+def trim_case_text(text):
+    """Returns only the parts of a case text the extraction prompt uses.
+
+    Keeps the title block (parties, citation, court and date), Prior History,
+    Procedural Posture, Outcome, the first Headnotes classification, the
+    Judges line and the opinion/concurrence/dissent author lines. Text that
+    does not follow the Lexis layout is returned unchanged.
+    """
+    first_heading = section_heading_pattern.search(text)
+    if first_heading is None:
+        return text
+    parts = [text[:min(first_heading.start(), MAX_HEADER)].strip()]
+    for heading, limit in paragraph_sections:
+        paragraph = _paragraph(text, heading, limit)
+        if paragraph:
+            parts.append(paragraph)
+    headnotes = headnotes_pattern.search(text)
+    if headnotes:
+        parts.append(headnotes.group(0).strip())
+    parts.extend(line.strip() for line in author_line_pattern.findall(text))
+    parts.extend(line.strip() for line in separate_opinion_pattern.findall(text)[:MAX_SEPARATE_OPINION_LINES])
+
+    # Drop repeats (the Judges line can also match as a separate-opinion line)
+    seen = set()
+    return '\n\n'.join(part for part in parts if part and not (part in seen or seen.add(part)))
+
+
+_encodings = {}
+
+
+def count_tokens(text, model='gpt-4'):
+    """Counts the tokens of text for model with tiktoken, or estimates them (4 characters per token) without it."""
+    if tiktoken is None:
+        return len(text) // 4
+    if model not in _encodings:
+        try:
+            _encodings[model] = tiktoken.encoding_for_model(model)
+        except KeyError:
+            _encodings[model] = tiktoken.get_encoding('cl100k_base')
+    return len(_encodings[model].encode(text, disallowed_special=()))
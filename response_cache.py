@@ -0,0 +1,83 @@
+import hashlib
+import sqlite3
+
+BUSY_TIMEOUT = 60  # seconds a write waits for another process's write to finish
+
+
+class ResponseCacheMiss(Exception):
+    """Raised in offline mode for a text that has no cached response."""
+
+
+def text_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def report_stats(hits, misses):
+    total = hits + misses
+    rate = hits / total if total else 0
+    print(f"Response cache: {hits} hits, {misses} misses ({rate:.0%} hit rate)")
+
+
+class ResponseCache:
+    """SQLite store of raw API responses keyed by case text hash, model and prompt version.
+
+    Changing the prompt in chatgptoption means bumping PROMPT_VERSION there;
+    responses from older versions are then no longer returned. With
+    offline=True nothing is sent to the API: misses raise ResponseCacheMiss,
+    so a rerun only replays what is already cached.
+    """
+
+    def __init__(self, path, offline=False):
+        self.path = path
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        # process_all_states(workers=N) writes from N processes: WAL lets reads
+        # go on during a write, and a writer waits for the lock instead of failing
+        self.connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                digest TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                response TEXT NOT NULL,
+                PRIMARY KEY (digest, model, prompt_version)
+            )"""
+        )
+        self.connection.commit()
+
+    def get(self, text, model, prompt_version):
+        """Returns the cached response for a text, or None (raising ResponseCacheMiss when offline)."""
+        row = self.connection.execute(
+            "SELECT response FROM responses WHERE digest = ? AND model = ? AND prompt_version = ?",
+            (text_digest(text), model, str(prompt_version)),
+        ).fetchone()
+        if row is not None:
+            self.hits += 1
+            return row[0]
+        self.misses += 1
+        if self.offline:
+            raise ResponseCacheMiss(f"No cached {model} response for prompt version {prompt_version}")
+        return None
+
+    def put(self, text, model, prompt_version, response):
+        # Committed right away: each response cost an API call
+        self.connection.execute(
+            "INSERT OR REPLACE INTO responses (digest, model, prompt_version, response) VALUES (?, ?, ?, ?)",
+            (text_digest(text), model, str(prompt_version), response),
+        )
+        self.connection.commit()
+
+    def report(self):
+        report_stats(self.hits, self.misses)
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
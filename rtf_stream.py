@@ -0,0 +1,280 @@
+import codecs
+import re
+from striprtf import striprtf
+from striprtf.striprtf import rtf_to_text
+
+
+class StreamingNotSupported(Exception):
+    """Raised for RTF that iter_rtf_text cannot decode piece by piece (binary \\pict data)."""
+
+
+# Control words that only occur in the document text, after the header
+# groups: once one is seen the font table can no longer follow
+body_word_pattern = re.compile(r'\\(?:par|pard|sect|sectd|page)(?=[^a-zA-Z])')
+
+
+def _font_table_end(text, table_from=0, body_from=0):
+    # Index just past the {\fonttbl ...} group, -1 if the body has begun
+    # without one, or None while the group is still open or may still come.
+    # The group does not start before table_from, nor the body before body_from.
+    start = striprtf.FONTTABLE_START.search(text, table_from)
+    if not start:
+        return -1 if body_word_pattern.search(text, body_from) else None
+    depth = 1
+    for brace in striprtf.BRACE.finditer(text, start.end()):
+        depth += 1 if brace.group() == '{' else -1
+        if depth == 0:
+            return brace.end()
+    return None
+
+
+def _group_closes(text, start, end):
+    depth = 0
+    for brace in striprtf.BRACE.finditer(text, start, end):
+        depth += 1 if brace.group() == '{' else -1
+        if depth == 0:
+            return True
+    return False
+
+
+def _safe_cut(buffer, start=0):
+    # Where the buffer can be split without cutting an RTF token in half:
+    # after the last newline, else before the last unescaped brace, else 0.
+    # Positions before start were already searched without finding either.
+    cut = buffer.rfind('\n', start) + 1
+    if cut == 0:
+        for position in range(len(buffer) - 1, max(start, 1) - 1, -1):
+            if buffer[position] in '{}' and buffer[position - 1] != '\\':
+                cut = position
+                break
+    # Keep \field groups (and the rest of their line) whole so the HYPERLINK
+    # rewrite sees the same text striprtf would.
+    field = buffer.rfind('{\\field', 0, cut)
+    while field >= 0 and not _group_closes(buffer, field, cut):
+        cut = buffer.rfind('\n', 0, field) + 1 or field
+        field = buffer.rfind('{\\field', 0, cut)
+    return cut
+
+
+def _read_decoded(file, block_size):
+    # Yields blocks of the file decoded like open(..., 'r', encoding='utf-8', errors='ignore')
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    pending_cr = ''
+    while True:
+        raw = file.read(block_size)
+        final = not raw
+        block = pending_cr + decoder.decode(raw, final=final)
+        pending_cr = ''
+        if block.endswith('\r') and not final:
+            # Could be the first half of \r\n
+            block, pending_cr = block[:-1], '\r'
+        if block:
+            yield block.replace('\r\n', '\n').replace('\r', '\n')
+        if final:
+            return
+
+
+def iter_rtf_text(rtf_path, block_size=1 << 16, encoding='cp1252', errors='strict'):
+    """Yields the plain text of an RTF file in pieces as the file is read.
+
+    The conversion follows striprtf.rtf_to_text and reuses its tables, so the
+    pieces join up to the same text it returns, except that HYPERLINK fields
+    are rewritten one line at a time. Raises StreamingNotSupported for files
+    with binary \\pict data.
+    """
+    stack = []
+    fonttbl = {}
+    default_font = None
+    current_font = None
+    ignorable = False
+    suppress_output = False
+    ucskip = 1
+    curskip = 0
+    hexes = None
+    depth = 0
+    in_document = False
+    fonts_read = False
+    table_from = body_from = 0
+    cut_from = 0
+    buffer = ''
+
+    with open(rtf_path, 'rb') as file:
+        blocks = _read_decoded(file, block_size)
+        eof = False
+        while not eof:
+            block = next(blocks, None)
+            if block is None:
+                eof = True
+            else:
+                buffer += block
+
+            if not fonts_read:
+                # striprtf reads the font table up front; wait until it is
+                # complete or the body has begun without one
+                end = _font_table_end(buffer, table_from, body_from)
+                if end is None and not eof:
+                    if buffer.find('\\fonttbl', table_from) < 0:
+                        # A group start can only come at or after the last brace
+                        table_from = max(table_from, buffer.rfind('{'))
+                    body_from = max(0, len(buffer) - len('\\sectd'))
+                    continue
+                for font_id, fcharset, font_name in striprtf.FONTTABLE.findall(striprtf.font_table_group(buffer)):
+                    fonttbl[font_id] = {
+                        'name': font_name.strip(),
+                        'charset': fcharset,
+                        'encoding': striprtf.charset_map.get(int(fcharset), encoding),
+                    }
+                fonts_read = True
+
+            cut = len(buffer) if eof else _safe_cut(buffer, cut_from)
+            if cut == 0:
+                cut_from = len(buffer)
+                continue
+            chunk, buffer = buffer[:cut], buffer[cut:]
+            cut_from = 0
+            if '\\bin' in chunk:
+                raise StreamingNotSupported(f"{rtf_path} contains binary picture data")
+            chunk = striprtf.HYPERLINKS.sub('\\1(\\2)', chunk)
+
+            out = []
+            for match in striprtf.PATTERN.finditer(chunk):
+                word, arg, _hex, char, brace, tchar = match.groups()
+                if hexes and not _hex:
+                    out.append(bytes.fromhex(hexes).decode(
+                        encoding=fonttbl.get(current_font, {'encoding': encoding}).get('encoding', encoding),
+                        errors=errors,
+                    ))
+                    hexes = None
+                if brace:
+                    curskip = 0
+                    if brace == '{':
+                        depth += 1
+                        in_document = True
+                        stack.append((ucskip, ignorable, suppress_output))
+                    elif brace == '}':
+                        depth -= 1
+                        if stack:
+                            ucskip, ignorable, suppress_output = stack.pop()
+                        else:
+                            ucskip = 0
+                            ignorable = True
+                        if in_document and depth <= 0:
+                            # Anything after the outer group is discarded
+                            yield ''.join(out)
+                            return
+                elif char:
+                    curskip = 0
+                    if char in striprtf.specialchars:
+                        if char in striprtf.sectionchars:
+                            current_font = default_font
+                        if not ignorable:
+                            out.append(striprtf.specialchars[char])
+                    elif char == '*':
+                        ignorable = True
+                elif word:
+                    curskip = 0
+                    if word in striprtf.destinations:
+                        ignorable = True
+                    elif word == 'ansicpg':
+                        encoding = f"cp{arg}"
+                        try:
+                            codecs.lookup(encoding)
+                        except LookupError:
+                            encoding = 'utf8'
+                    if ignorable or suppress_output:
+                        pass
+                    elif word in striprtf.specialchars:
+                        out.append(striprtf.specialchars[word])
+                    elif word == 'uc':
+                        ucskip = int(arg)
+                    elif word == 'u':
+                        if arg is None:
+                            curskip = ucskip
+                        else:
+                            c = int(arg)
+                            if c < 0:
+                                c += 0x10000
+                            out.append(chr(c))
+                            curskip = ucskip
+                    elif word == 'f':
+                        current_font = arg
+                    elif word == 'deff':
+                        default_font = arg
+                    elif word in ('fonttbl', 'colortbl'):
+                        suppress_output = True
+                elif _hex:
+                    if curskip > 0:
+                        curskip -= 1
+                    elif not ignorable:
+                        hexes = _hex if not hexes else hexes + _hex
+                elif tchar:
+                    if curskip > 0:
+                        curskip -= 1
+                    elif not ignorable and not suppress_output:
+                        out.append(tchar)
+            if out:
+                yield ''.join(out)
+
+
+# Everything MainCode's header extractors use comes before the end of the
+# author block after the Judges: section: the "Opinion by:", "Concur by:" and
+# "Dissent by:" lines, then the body's "Opinion" heading and the byline under
+# it ("PER CURIAM."). Without the heading, the header ends at the first
+# complete non-blank line after the author block. HEADER_VERSION is part of
+# the text cache's key for header texts; bump it when the header end changes.
+HEADER_VERSION = 2
+judges_marker_pattern = re.compile(r'Judges:', re.IGNORECASE)
+author_line = r'(?:Opinion|Concur|Dissent) by:?[^\n]*\n'
+author_block = rf'(?:{author_line}(?:[ \t]*\n)*)+'
+opinion_heading = r'Opinion[ \t]*\n(?:[ \t]*\n)*[^\n]*\S[^\n]*\n'
+header_end_pattern = re.compile(
+    rf'^(?:{author_block})?{opinion_heading}'
+    rf'|^{author_block}(?!(?:Opinion|Concur|Dissent) by|Opinion[ \t]*\n)(?=[^\n]*\S[^\n]*\n)',
+    re.IGNORECASE | re.MULTILINE,
+)
+header_line_pattern = re.compile(r'(?:Opinion|Concur|Dissent) by|Opinion[ \t]*$', re.IGNORECASE)
+
+
+def _resume_point(text, floor):
+    """Start of the trailing run of author, heading, blank and unfinished lines: the next header end match starts there or later."""
+    start = text.rfind('\n', floor) + 1
+    while start > floor:
+        line_start = max(floor, text.rfind('\n', floor, start - 1) + 1)
+        line = text[line_start:start - 1]
+        if line.strip() and not header_line_pattern.match(line):
+            break
+        start = line_start
+    return max(start, floor)
+
+
+def rtf_header_text(rtf_path, block_size=1 << 16):
+    """Decodes an RTF only up to the end of its header sections.
+
+    Returns (text, complete). complete is True when the whole document was
+    decoded, either because the header markers were never found or because
+    the file cannot be streamed; text is then exactly rtf_to_text's output.
+    """
+    text = ''
+    judges_end = None
+    scan_from = 0
+    try:
+        for piece in iter_rtf_text(rtf_path, block_size):
+            text += piece
+            if judges_end is None:
+                match = judges_marker_pattern.search(text, scan_from)
+                if match is None:
+                    scan_from = max(0, len(text) - len('Judges:'))
+                    continue
+                judges_end = scan_from = match.end()
+            match = header_end_pattern.search(text, scan_from)
+            if match:
+                return text[:match.end()], False
+            scan_from = _resume_point(text, judges_end)
+    except StreamingNotSupported:
+        pass
+    return _full_text(rtf_path), True
+
+
+def _full_text(rtf_path):
+    with open(rtf_path, 'r', encoding='utf-8', errors='ignore') as file:
+        return rtf_to_text(file.read())
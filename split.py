@@ -1,6 +1,10 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
 import os
 import sys
+from bigcsvoutput import clean_names_vectorized, name_key
+from dime_scan import read_header
 
 def split_csv(input_file, output_prefix, chunk_size=1000000):
     print(f"Attempting to read {input_file}")
@@ -17,6 +21,63 @@ def split_csv(input_file, output_prefix, chunk_size=1000000):
         print(f"Error type: {type(e).__name__}")
         print(f"Error details: {sys.exc_info()}")
 
+class _LineCounter:
+    """Binary file wrapper that counts the lines read through it."""
+
+    def __init__(self, file):
+        self.file = file
+        self.newlines = 0
+        self.last = b'\n'
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        if data:
+            self.newlines += data.count(b'\n')
+            self.last = data[-1:]
+        return data
+
+    def data_lines(self):
+        # Lines after the header, a last line without a newline included
+        lines = self.newlines + (self.last != b'\n')
+        return max(lines - 1, 0)
+
+def _partitioned_batches(reader, schema, letters, counts):
+    for i, chunk in enumerate(reader):
+        clean_names = clean_names_vectorized(chunk['most.recent.contributor.name'])
+        chunk['name_key'] = name_key(clean_names, letters)
+        state = chunk['most.recent.contributor.state'].str.strip().str.upper()
+        chunk['state'] = state.where(state.str.fullmatch('[A-Z]{2}'), '__').fillna('__')
+        counts['rows'] += len(chunk)
+        print(f"Partitioned chunk {i} ({counts['rows']} rows so far)")
+        yield from pa.Table.from_pandas(chunk, schema=schema, preserve_index=False).to_batches()
+
+def split_parquet(input_file, output_dir, chunk_size=1000000, letters=1):
+    """Writes the contributors as Parquet partitioned by name_key (first letters of the cleaned last name) and state."""
+    print(f"Attempting to read {input_file}")
+    try:
+        # Every column as text, fixed up front from the header: a column that
+        # is empty in the first chunk would otherwise be typed as null
+        columns, _ = read_header(input_file)
+        schema = pa.schema([(column, pa.string()) for column in columns + ['name_key', 'state']])
+        # Lines are counted as pandas reads them, for the skipped-line count
+        with open(input_file, 'rb') as file:
+            lines = _LineCounter(file)
+            reader = pd.read_csv(lines, chunksize=chunk_size, encoding='latin-1', on_bad_lines='skip', dtype=str)
+            print("File opened successfully. Starting to partition chunks...")
+            counts = {'rows': 0}
+            ds.write_dataset(
+                _partitioned_batches(reader, schema, letters, counts), output_dir, schema=schema, format='parquet',
+                partitioning=['name_key', 'state'], partitioning_flavor='hive',
+                existing_data_behavior='delete_matching',
+                max_open_files=4096, min_rows_per_group=50000, max_rows_per_group=500000,
+            )
+        skipped = lines.data_lines() - counts['rows']
+        print(f"Finished partitioning {counts['rows']} rows into {output_dir} ({skipped} bad lines skipped).")
+    except Exception as e:
+        print(f"An error occurred: {str(e)}")
+        print(f"Error type: {type(e).__name__}")
+        print(f"Error details: {sys.exc_info()}")
+
 if __name__ == "__main__":
     print("Script started.")
     current_dir = os.getcwd()
@@ -34,6 +95,9 @@ if __name__ == "__main__":
     else:
         file_size = os.path.getsize(input_file) / (1024*1024)
         print(f"Input file '{input_file}' found. File size: {file_size:.2f} MB")
-        split_csv(input_file, output_prefix)
+        if '--parquet' in sys.argv:
+            split_parquet(input_file, 'dime_contributors_partitioned')
+        else:
+            split_csv(input_file, output_prefix)
     
     print("Script finished.")
\ No newline at end of file
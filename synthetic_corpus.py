@@ -0,0 +1,245 @@
+import os
+import random
+import sys
+from JUDGE_CODES import JUDGE_CODES
+
+# Synthetic Lexis-style RTF case files for benchmarking MainCode without the
+# licensed downloads. Each file has the sections MainCode's extractors look
+# for (title line, court and date, parties, Prior History, Outcome,
+# Headnotes, Judges, Opinion by/Concur by/Dissent by), with variation in
+# wording, court size, votes and opinion length. The benches are the real
+# ones in JUDGE_CODES (5 to 18 justices). Output is deterministic per seed.
+
+# State -> (name, Lexis reporter abbreviation)
+STATES = {
+    'AK': ('Alaska', 'Alas.'), 'AL': ('Alabama', 'Ala.'), 'AR': ('Arkansas', 'Ark.'),
+    'AZ': ('Arizona', 'Ariz.'), 'CA': ('California', 'Cal.'), 'CO': ('Colorado', 'Colo.'),
+    'CT': ('Connecticut', 'Conn.'), 'DE': ('Delaware', 'Del.'), 'FL': ('Florida', 'Fla.'),
+    'GA': ('Georgia', 'Ga.'), 'HI': ('Hawaii', 'Haw.'), 'IA': ('Iowa', 'Iowa'),
+    'ID': ('Idaho', 'Ida.'), 'IL': ('Illinois', 'Ill.'), 'IN': ('Indiana', 'Ind.'),
+    'KS': ('Kansas', 'Kan.'), 'KY': ('Kentucky', 'Ky.'), 'LA': ('Louisiana', 'La.'),
+    'MA': ('Massachusetts', 'Mass.'), 'MD': ('Maryland', 'Md.'), 'ME': ('Maine', 'Me.'),
+    'MI': ('Michigan', 'Mich.'), 'MN': ('Minnesota', 'Minn.'), 'MO': ('Missouri', 'Mo.'),
+    'MS': ('Mississippi', 'Miss.'), 'MT': ('Montana', 'Mont.'), 'NC': ('North Carolina', 'N.C.'),
+    'ND': ('North Dakota', 'N.D.'), 'NE': ('Nebraska', 'Neb.'), 'NH': ('New Hampshire', 'N.H.'),
+    'NJ': ('New Jersey', 'N.J.'), 'NM': ('New Mexico', 'N.M.'), 'NV': ('Nevada', 'Nev.'),
+    'NY': ('New York', 'N.Y.'), 'OH': ('Ohio', 'Ohio'), 'OK': ('Oklahoma', 'Okla.'),
+    'OR': ('Oregon', 'Ore.'), 'PA': ('Pennsylvania', 'Pa.'), 'RI': ('Rhode Island', 'R.I.'),
+    'SC': ('South Carolina', 'S.C.'), 'SD': ('South Dakota', 'S.D.'), 'TN': ('Tennessee', 'Tenn.'),
+    'TX': ('Texas', 'Tex.'), 'UT': ('Utah', 'Utah'), 'VA': ('Virginia', 'Va.'),
+    'VT': ('Vermont', 'Vt.'), 'WA': ('Washington', 'Wash.'), 'WI': ('Wisconsin', 'Wis.'),
+    'WV': ('West Virginia', 'W. Va.'), 'WY': ('Wyoming', 'Wyo.'),
+}
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
+FIRST_NAMES = ['John', 'Mary', 'José', 'Ann', 'Robert', 'Linda', 'Michael', 'Susan', 'David', 'Karen', 'Renée', 'James']
+LAST_NAMES = ['Johnson', 'García', 'Smith', 'Nguyen', "O'Connor", 'Miller', 'Hernández', 'Davis', 'Wilson-Price', 'Lee', 'Brown', 'Müller']
+COMPANIES = ['Acme Insurance Company', 'First National Bank', 'City of Springfield', 'Board of Education', 'Department of Revenue', 'Allied Health Systems, Inc.']
+LOWER_COURTS = ['Superior Court', 'District Court', 'Circuit Court', 'Court of Appeals', 'Court of Common Pleas']
+COUNTIES = ['Maricopa', 'Cascade', 'Jefferson', 'Washington', 'Franklin', 'Lincoln', 'Madison']
+# Outcome wording -> the disposition MainCode should find
+OUTCOMES = [
+    'Affirmed.',
+    'Judgment affirmed.',
+    'Reversed and remanded.',
+    'Reversed.',
+    'Vacated and remanded for further proceedings.',
+    'Affirmed in part, reversed in part, and remanded.',
+    'Affirmed and reversed in part.',
+    'Vacated.',
+    'Affirmed and remanded.',
+    'Petition denied.',
+    'Appeal dismissed.',
+    'Motion granted.',
+    'The court declined to reach the merits.',
+]
+LAW_AREAS = [
+    ('Criminal Law & Procedure', ['Appeals', 'Standards of Review', 'Sentencing', 'Search & Seizure', 'Trials']),
+    ('Civil Procedure', ['Appeals', 'Summary Judgment', 'Jurisdiction', 'Pleading & Practice']),
+    ('Constitutional Law', ['Bill of Rights', 'Due Process', 'Equal Protection']),
+    ('Torts', ['Negligence', 'Damages', 'Products Liability']),
+    ('Family Law', ['Child Custody', 'Marital Termination & Spousal Support']),
+    ('Contracts Law', ['Breach', 'Contract Interpretation', 'Remedies']),
+    ('Governments', ['Local Governments', 'State & Territorial Governments', 'Legislation']),
+]
+CORE_TERMS = ['trial court', 'abuse of discretion', 'de novo', 'summary judgment', 'jury', 'sentence', 'statute', 'plain meaning', 'harmless', 'suppress', 'custody', 'damages', 'contract', 'waiver']
+BODY_WORDS = (
+    'the court of appeals held that trial court did not err in admitting evidence because defendant failed to preserve '
+    'issue for review we conclude statute plain meaning legislature intended review de novo whether record supports '
+    'finding reasonable jury could have found beyond doubt elements offense therefore judgment is consistent with '
+    'our precedent and we decline invitation overrule prior decisions party argues error was harmless'
+).split()
+
+
+def rtf_escape(text):
+    """Escapes text for an RTF body: backslashes and braces, then cp1252 or \\u escapes for non-ASCII."""
+    out = []
+    for char in text:
+        if char in '\\{}':
+            out.append('\\' + char)
+        elif ord(char) < 128:
+            out.append(char)
+        else:
+            try:
+                out.append("\\'%02x" % char.encode('cp1252')[0])
+            except UnicodeEncodeError:
+                out.append('\\u%d?' % (ord(char) if ord(char) < 32768 else ord(char) - 65536))
+    return ''.join(out)
+
+
+def _person(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _party(rng, state_name):
+    roll = rng.random()
+    if roll < 0.4:
+        return f"State of {state_name}"
+    if roll < 0.6:
+        return rng.choice(COMPANIES)
+    return _person(rng)
+
+
+def _sentence(rng, words=(8, 24)):
+    sentence = ' '.join(rng.choice(BODY_WORDS) for _ in range(rng.randint(*words)))
+    return sentence[0].upper() + sentence[1:] + '.'
+
+
+def _paragraph(rng, sentences=(3, 9)):
+    return ' '.join(_sentence(rng) for _ in range(rng.randint(*sentences)))
+
+
+def _bench(rng, state):
+    justices = [name.upper() for name in JUDGE_CODES[state]]
+    size = rng.randint(min(5, len(justices)), len(justices))
+    return rng.sample(justices, size)
+
+
+def _judges_line(rng, bench, per_curiam):
+    """Returns (Judges: text, author, {justice: role}) with dissents, partial dissents, recusals and absences."""
+    roles = {}
+    for justice in bench[1:]:
+        roll = rng.random()
+        roles[justice] = (
+            'dissents' if roll < 0.12 else
+            'concurs in part and dissents in part' if roll < 0.16 else
+            'recused' if roll < 0.19 else
+            'did not participate' if roll < 0.21 else
+            'concurs' if roll < 0.28 else
+            'joins'
+        )
+    statements = [f"{justice}, J., {role}." for justice, role in roles.items() if role not in ('joins', 'concurs')]
+    joining = [justice for justice, role in roles.items() if role in ('joins', 'concurs')]
+    author = bench[0]
+
+    if joining:
+        names = ', '.join(joining[:-1] + [f"and {joining[-1]}"]) if len(joining) > 1 else joining[0]
+        concur_line = f"{author}, C.J., {names}, JJ., concur."
+    else:
+        concur_line = f"{author}, C.J., concurs."
+
+    if per_curiam:
+        return ' '.join([concur_line] + statements), 'PER CURIAM', roles
+    if rng.random() < 0.5:
+        # Arizona-style sentence naming the author and everyone who joined
+        joined = ', '.join(joining) if joining else 'no other justice'
+        line = f"CHIEF JUSTICE {author} authored the opinion of the Court, in which JUSTICES {joined} joined."
+    else:
+        line = concur_line
+    return ' '.join([line] + statements), author, roles
+
+
+def generate_case(rng, state, number, body_paragraphs=(10, 60)):
+    """Returns the plain text lines of one synthetic case (each line becomes an RTF paragraph)."""
+    state_name, reporter = STATES[state]
+    year = rng.randint(1995, 2023)
+    appellant, appellee = _party(rng, state_name), _party(rng, state_name)
+    bench = _bench(rng, state)
+    per_curiam = rng.random() < 0.1
+    judges_line, author, roles = _judges_line(rng, bench, per_curiam)
+    area, topics = rng.choice(LAW_AREAS)
+
+    lines = [
+        f"{number}. {appellant} v. {appellee}, {year} {reporter} LEXIS {rng.randint(1, 999)}",
+        '',
+        f"Supreme Court of {state_name}",
+        f"{rng.choice(MONTHS)} {rng.randint(1, 28)}, {year}, {rng.choice(['Filed', 'Decided', 'Released'])}",
+        f"No. {rng.choice(['CR', 'CV', 'SC', 'DA'])}-{year}-{rng.randint(100, 9999):04d}",
+        '',
+    ]
+    if rng.random() < 0.7:
+        lines += [f"{appellant.upper()}, Appellant, v. {appellee.upper()}, Appellee.", '']
+    else:
+        lines += [f"{appellant.upper()}, Petitioner, v. {appellee.upper()}, Respondent.", '']
+    lines += [
+        'Prior History',
+        f"Appeal from the {rng.choice(LOWER_COURTS)} of {rng.choice(COUNTIES)} County, No. {rng.randint(1000, 99999)}. {_sentence(rng)}",
+        '',
+        'Core Terms',
+        ', '.join(rng.sample(CORE_TERMS, 6)),
+        '',
+        'Case Summary',
+        '',
+        'Procedural Posture',
+        _paragraph(rng, (1, 3)),
+        '',
+        'Overview',
+        _paragraph(rng, (2, 6)),
+        '',
+        'Outcome',
+        rng.choice(OUTCOMES),
+        '',
+        'LexisNexis® Headnotes',
+    ]
+    for _ in range(rng.randint(1, 6)):
+        lines += [f"{area} > {' > '.join(rng.sample(topics, min(2, len(topics))))}", _paragraph(rng, (1, 3)), '']
+    lines += [
+        f"Counsel: For appellant: {_person(rng)}, {rng.choice(COUNTIES)}. For appellee: {_person(rng)}, Assistant Attorney General.",
+        '',
+        f"Judges: {judges_line}",
+        '',
+    ]
+    concurring = [justice for justice, role in roles.items() if role == 'concurs']
+    dissenting = [justice for justice, role in roles.items() if role in ('dissents', 'concurs in part and dissents in part')]
+    if not per_curiam:
+        lines.append(f"Opinion by: {author}")
+    lines += [f"Concur by: {justice}" for justice in concurring]
+    lines += [f"Dissent by: {justice}" for justice in dissenting]
+    lines += ['', 'Opinion', '']
+    if per_curiam:
+        lines += ['PER CURIAM.', '']
+    lines += [_paragraph(rng) for _ in range(rng.randint(*body_paragraphs))]
+    for justice in concurring:
+        lines += ['', f"JUSTICE {justice}, concurring.", _paragraph(rng)]
+    for justice in dissenting:
+        role = 'concurring in part and dissenting in part' if roles[justice].startswith('concurs') else 'dissenting'
+        lines += ['', f"JUSTICE {justice}, {role}.", _paragraph(rng), _paragraph(rng)]
+    return lines
+
+
+def case_to_rtf(lines):
+    body = '\n\\par '.join(rtf_escape(line) for line in lines)
+    return '{\\rtf1\\ansi\\ansicpg1252\\deff0{\\fonttbl{\\f0\\froman Times New Roman;}}\\f0\\fs24 ' + body + '\n\\par }'
+
+
+def write_corpus(output_folder, count, seed=0, states=None, body_paragraphs=(10, 60)):
+    """Writes count synthetic cases as output_folder/<STATE>/case_<n>.rtf, spread over the states; returns the paths."""
+    rng = random.Random(seed)
+    states = sorted(states or JUDGE_CODES)
+    paths = []
+    for i in range(count):
+        state = states[i % len(states)]
+        state_folder = os.path.join(output_folder, state)
+        os.makedirs(state_folder, exist_ok=True)
+        path = os.path.join(state_folder, f"case_{i:06d}.rtf")
+        with open(path, 'w', encoding='ascii') as file:
+            file.write(case_to_rtf(generate_case(rng, state, i % 50 + 1, body_paragraphs)))
+        paths.append(path)
+        if (i + 1) % 10000 == 0:
+            print(f"Wrote {i + 1} of {count} cases")
+    print(f"Wrote {count} synthetic cases to {output_folder}")
+    return paths
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    write_corpus('synthetic_states', count)
@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+from MainCode import (
+    ParsedCase, disposition_mapping, extract_disposition, extract_justice_info, extract_justices,
+    extract_text_from_rtf, extract_votes_appellant_appellee, extract_votes_original, format_votes,
+    process_rtf_folder,
+)
+from case_votes import load_votes, votes_from_wide
+from synthetic_corpus import write_corpus
+
+
+@pytest.fixture(scope='module')
+def state_folder(tmp_path_factory):
+    corpus = tmp_path_factory.mktemp('corpus')
+    write_corpus(corpus, 12, seed=9, states=['AZ'], body_paragraphs=(2, 6))
+    return corpus / 'AZ'
+
+
+def test_case_ids_and_states_join_the_votes(state_folder, tmp_path):
+    process_rtf_folder(state_folder, tmp_path / 'cases.csv', votes_output=tmp_path / 'votes.csv')
+    cases = pd.read_csv(tmp_path / 'cases.csv')
+    votes = load_votes(str(tmp_path / 'votes.csv'))
+    assert cases['case_id'].tolist() == list(range(len(cases)))
+    assert set(cases['state']) == set(votes['state']) == {'AZ'}
+    assert set(votes['case_id']) <= set(cases['case_id'])
+    # The streamed vote rows agree with the ones melted from the wide CSV,
+    # which only has the first nine seats
+    melted = votes_from_wide(cases)
+    streamed = votes[votes['seat'] <= 9]
+    key = ['case_id', 'state', 'seat', 'judge_name']
+    assert melted[key].astype(str).values.tolist() == streamed[key].astype(str).values.tolist()
+
+
+def test_worker_processes_match_a_serial_run(state_folder, tmp_path):
+    process_rtf_folder(state_folder, tmp_path / 'serial.csv', votes_output=tmp_path / 'serial_votes.csv')
+    process_rtf_folder(state_folder, tmp_path / 'parallel.csv', workers=3, votes_output=tmp_path / 'parallel_votes.csv')
+    assert len(pd.read_csv(tmp_path / 'serial.csv')) == 12
+    assert (tmp_path / 'parallel.csv').read_text() == (tmp_path / 'serial.csv').read_text()
+    assert (tmp_path / 'parallel_votes.csv').read_text() == (tmp_path / 'serial_votes.csv').read_text()
+
+
+def test_parsed_case_matches_the_per_field_functions(state_folder):
+    for path in sorted(state_folder.iterdir()):
+        text = extract_text_from_rtf(path)
+        case = ParsedCase(text)
+        court_decision = extract_disposition(text, disposition_mapping)[1]
+        votes_original = extract_votes_original(text)
+        votes_appellant_appellee = extract_votes_appellant_appellee(text, court_decision, votes_original)
+        assert case.justices == extract_justices(text)
+        assert format_votes(case.votes_original) == votes_original
+        assert format_votes(case.votes_appellant_appellee) == votes_appellant_appellee
+        assert case.justice_info[:9] == extract_justice_info(text, court_decision, votes_original, votes_appellant_appellee)
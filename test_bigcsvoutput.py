@@ -0,0 +1,60 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import bigcsvoutput
+from bigcsvoutput import (
+    clean_names_vectorized, clean_single_name, match_search_names, peak_rss_mb, process_all_chunks, reset_peak_rss,
+)
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/clear_refs'), reason="the peak RSS can only be reset on Linux")
+def test_peak_rss_is_measured_from_the_reset():
+    big = np.ones(50_000_000)  # 400 MB
+    del big
+    reset_peak_rss()
+    start = peak_rss_mb()
+    small = np.ones(5_000_000)  # 40 MB
+    del small
+    assert 30 < peak_rss_mb() - start < 200
+
+
+NAMES = [
+    'SMITH, JOHN A', 'John A. Smith', 'Mr. John Smith', 'DR. JANE DOE, MD', 'Hon. Mary  Jones Jr.', 'Smith, John, Jr.',
+    'Smith III', 'Prof.Smith', 'smith', '', '   ', ' , ', 'ADAMS,JOHN,QUINCY', 'O\'BRIEN  PAT\tIV', 'doe jane esq.',
+    'Müller, Jürgen', 'İLKER YILMAZ', 'Smith Jr.\n', 'Ng Wei', None, np.nan,
+]
+
+
+def test_vectorized_cleaning_matches_clean_single_name():
+    rng = np.random.default_rng(0)
+    alphabet = list("abcXYZ ,.\t\n-'é") + ['Jr.', 'Mr. ', 'II', ' III', 'Esq.', 'Dr.']
+    random_names = [''.join(rng.choice(alphabet, rng.integers(0, 12))) for _ in range(5000)]
+    names = pd.Series(NAMES + random_names + NAMES, name='most.recent.contributor.name')
+    expected = names.apply(clean_single_name)
+    actual = clean_names_vectorized(names)
+    assert actual.index.equals(names.index)
+    assert actual.tolist() == expected.tolist()
+
+
+def test_chunks_share_one_search_lookup(tmp_path, monkeypatch):
+    pd.DataFrame({'name': ['John Smith', 'Ann Timmer']}).to_csv(tmp_path / 'names.csv', index=False)
+    for i in range(4):
+        pd.DataFrame({
+            'bonica.cid': [i * 10 + 1, i * 10 + 2],
+            'most.recent.contributor.name': ['SMITH, JOHN', 'DOE, JANE'],
+            'most.recent.contributor.state': ['AZ', 'NM'],
+        }).to_csv(tmp_path / f"chunk_{i}.csv", index=False)
+    lookups = []
+
+    def recording_match(chunk, search_lookup):
+        lookups.append(search_lookup)
+        return match_search_names(chunk, search_lookup)
+    monkeypatch.setattr(bigcsvoutput, 'match_search_names', recording_match)
+    monkeypatch.chdir(tmp_path)
+    process_all_chunks(str(tmp_path / 'chunk_*.csv'), str(tmp_path / 'names.csv'), 'processed')
+
+    assert len(lookups) == 4 and all(lookup is lookups[0] for lookup in lookups)
+    matches = pd.read_csv(tmp_path / 'final_output.csv')
+    assert sorted(matches['bonica.cid']) == [1, 11, 21, 31]
+    assert set(matches['matched_search_name']) == {'John Smith'}
@@ -0,0 +1,32 @@
+import datetime
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from MainCode import process_rtf_folder
+from case_parquet import load_cases
+from synthetic_corpus import write_corpus
+
+
+def test_folder_parquet_round_trip(tmp_path):
+    write_corpus(tmp_path / 'corpus', 12, seed=9, states=['AZ'], body_paragraphs=(2, 6))
+    process_rtf_folder(tmp_path / 'corpus' / 'AZ', tmp_path / 'cases.csv', parquet_output=tmp_path / 'cases.parquet')
+
+    schema = pq.read_schema(tmp_path / 'cases.parquet')
+    assert schema.field('case_id').type == pa.int32()
+    assert schema.field('decision_date').type == pa.date32()
+    assert schema.field('disposition_code').type == schema.field('j1_vote').type == pa.int8()
+    assert pa.types.is_dictionary(schema.field('state').type) and pa.types.is_dictionary(schema.field('j1_name').type)
+    assert schema.field('case_name').type == pa.string()
+
+    cases = load_cases(tmp_path / 'cases.parquet')
+    assert str(cases['court_decision'].dtype) == 'Int8'
+    assert isinstance(cases['decision_date'].iloc[0], datetime.date)
+    # Empty seats are null names, not ''
+    assert cases['j9_name'].isna().all()
+
+    csv_rows = pd.read_csv(tmp_path / 'cases.csv', dtype=str, keep_default_na=False)
+    assert list(cases.columns) == list(csv_rows.columns)
+    for column in csv_rows.columns:
+        expected = [value or None for value in csv_rows[column]]
+        actual = [None if pd.isna(value) else str(value) for value in cases[column]]
+        assert actual == expected, column
@@ -0,0 +1,18 @@
+import pandas as pd
+from case_votes import votes_from_wide
+
+
+def test_judge_code_88_is_kept():
+    # 88 is IA McDonald's code in J*_Code, but the empty-seat filler in the vote columns
+    cases = pd.DataFrame({
+        'state': ['IA', 'IA'],
+        'J1_Name': ['McDonald', 'Appel'], 'J1_Code': [88, 80], 'J1_Vote': [1, 0], 'J1_VoteAdjusted': [2, 1],
+        'J2_Name': ['Waterman', ''], 'J2_Code': [92, None], 'J2_Vote': [0, 88], 'J2_VoteAdjusted': [1, 88],
+    })
+    votes = votes_from_wide(cases)
+    # The second case's empty second seat is dropped
+    assert votes[['case_id', 'seat', 'judge_name', 'judge_code', 'vote']].astype(object).values.tolist() == [
+        [0, 1, 'McDonald', 88, 1],
+        [0, 2, 'Waterman', 92, 0],
+        [1, 1, 'Appel', 80, 0],
+    ]
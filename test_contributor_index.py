@@ -0,0 +1,44 @@
+import pandas as pd
+from bigcsvoutput import clean_single_name
+from contributor_index import ContributorIndex
+
+CONTRIBUTORS = pd.DataFrame({
+    'bonica.cid': range(1, 11),
+    'most.recent.contributor.name': [
+        'SMITH, JOHN', 'John Smith', 'SMITH, JANE', 'Smith, John', 'Mr. John Smith Jr.',
+        'BOLICK, CLINT', 'bolick, clint', 'Timmer, Ann', 'MCDONALD, ANDREW', None,
+    ],
+    'most.recent.contributor.state': ['AZ', 'NM', 'AZ', ' az', 'AZ', 'AZ', 'TX', 'AZ', 'CT', 'AZ'],
+    'most.recent.contributor.zipcode': ['85001'] * 10,
+    'most.recent.contributor.employer': ['RETIRED'] * 10,
+    'amount': range(10),  # a column the index does not keep
+})
+QUERIES = [('Smith, John', None), ('John Smith', 'AZ'), ('Smith', 'AZ'), ('Smith', None), ('BOLICK', 'tx'), ('McDonald', 'IA'), ('Nobody', None)]
+
+
+def expected_matches(name, state):
+    # The same lookup as a pandas filter over the whole file
+    contributors = CONTRIBUTORS.dropna(subset=['most.recent.contributor.name'])
+    clean_names = contributors['most.recent.contributor.name'].apply(clean_single_name)
+    states = contributors['most.recent.contributor.state'].str.strip().str.upper()
+    query = clean_single_name(name)
+    if ',' in query:
+        matches = clean_names == query
+    else:
+        matches = clean_names.str.split(',').str[0].str.strip() == query
+    if state is not None:
+        matches &= states == state.upper()
+    return sorted(contributors.loc[matches, 'bonica.cid'])
+
+
+def test_candidates_match_a_pandas_filter(tmp_path):
+    CONTRIBUTORS.to_csv(tmp_path / 'contributors.csv', index=False)
+    with ContributorIndex(str(tmp_path / 'contributors.sqlite')) as index:
+        assert index.build(tmp_path / 'contributors.csv', chunk_size=3) == 9
+    with ContributorIndex(str(tmp_path / 'contributors.sqlite')) as index:
+        candidates = index.candidates([name for name, _ in QUERIES], [state for _, state in QUERIES])
+    for query_id, (name, state) in enumerate(QUERIES):
+        found = candidates[candidates['query_id'] == query_id]
+        assert sorted(found['bonica_cid'].astype(int)) == expected_matches(name, state), (name, state)
+        assert (found['query_name'] == name).all()
+    assert set(candidates['match']) == {'full', 'last'}
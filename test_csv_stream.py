@@ -0,0 +1,44 @@
+import csv
+import pytest
+from csv_stream import StreamingCSVWriter, merge_csv_shards
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+def test_rows_replace_the_output_on_close(tmp_path):
+    path = tmp_path / 'out.csv'
+    path.write_text('old\n')
+    with StreamingCSVWriter(str(path), ['a', 'b'], flush_every=1) as writer:
+        writer.writerow({'a': 1, 'extra': 'dropped'})
+        assert path.read_text() == 'old\n'
+    assert read_rows(path) == [{'a': '1', 'b': ''}]
+    assert not (tmp_path / 'out.csv.partial').exists()
+
+
+def test_empty_run_leaves_the_output_untouched(tmp_path):
+    path = tmp_path / 'out.csv'
+    path.write_text('old\n')
+    with StreamingCSVWriter(str(path), ['a']):
+        pass
+    assert path.read_text() == 'old\n'
+    assert not (tmp_path / 'out.csv.partial').exists()
+
+
+def test_failed_run_keeps_the_partial_file(tmp_path):
+    path = tmp_path / 'out.csv'
+    with pytest.raises(RuntimeError):
+        with StreamingCSVWriter(str(path), ['a']) as writer:
+            writer.writerow({'a': 1})
+            raise RuntimeError
+    assert not path.exists()
+    assert read_rows(tmp_path / 'out.csv.partial') == [{'a': '1'}]
+
+
+def test_merge_takes_the_union_of_columns(tmp_path):
+    (tmp_path / 'AZ.csv').write_text('a,b\n1,2\n')
+    (tmp_path / 'CA.csv').write_text('b,c\n3,4\n')
+    assert merge_csv_shards([tmp_path / 'AZ.csv', tmp_path / 'CA.csv'], str(tmp_path / 'all.csv')) == 2
+    assert read_rows(tmp_path / 'all.csv') == [{'a': '1', 'b': '2', 'c': ''}, {'a': '', 'b': '3', 'c': '4'}]
@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+from dime_scan import DIME_COLUMNS, MATCH_COLUMNS, block_lines, byte_ranges, read_block, read_header, scan_dime_file
+
+
+@pytest.mark.parametrize('content, lines', [
+    (b'name,state', 0),
+    (b'name,state\n', 0),
+    (b'name,state\nSMITH,AZ', 1),
+    (b'name,state\nSMITH,AZ\n', 1),
+    (b'name,state\n' + b'SMITH,AZ\n' * 1000 + b'JONES,NM', 1001),
+])
+@pytest.mark.parametrize('block_size', [1, 7, 1 << 20])
+def test_block_lines_add_up_to_the_data_lines(tmp_path, content, lines, block_size):
+    path = tmp_path / 'contributors.csv'
+    path.write_bytes(content)
+    _, data_start = read_header(path)
+    assert sum(block_lines(read_block(path, begin, end)) for begin, end in byte_ranges(path, data_start, block_size)) == lines
+
+
+def test_scan_file_without_data_lines(tmp_path):
+    pd.DataFrame({'name': ['John Smith']}).to_csv(tmp_path / 'names.csv', index=False)
+    (tmp_path / 'contributors.csv').write_text(','.join(DIME_COLUMNS) + '\n')
+    matches = scan_dime_file(str(tmp_path / 'contributors.csv'), str(tmp_path / 'names.csv'), str(tmp_path / 'matches.csv'))
+    assert matches.empty
+    assert list(pd.read_csv(tmp_path / 'matches.csv').columns) == MATCH_COLUMNS
+
+
+def test_scan_matches_across_blocks(tmp_path):
+    pd.DataFrame({'name': ['John Smith']}).to_csv(tmp_path / 'names.csv', index=False)
+    pd.DataFrame({
+        'bonica.cid': range(1, 7),
+        'most.recent.contributor.name': ['SMITH, JOHN', 'DOE, JANE', 'John Smith', 'ROE, RICHARD', 'smith, john', None],
+        'most.recent.contributor.state': ['AZ'] * 6,
+    }).to_csv(tmp_path / 'contributors.csv', index=False)
+    matches = scan_dime_file(str(tmp_path / 'contributors.csv'), str(tmp_path / 'names.csv'), str(tmp_path / 'matches.csv'), block_size=20, workers=2)
+    assert sorted(matches['bonica.cid']) == [1, 3, 5]
+    assert list(matches.columns) == [column for column in MATCH_COLUMNS if column in matches.columns]
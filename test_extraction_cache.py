@@ -0,0 +1,29 @@
+import MainCode
+from MainCode import field_group_versions, process_rtf_folder
+from extraction_cache import ExtractionCache, file_digest
+from synthetic_corpus import write_corpus
+
+
+def test_groups_round_trip_per_version(tmp_path):
+    versions = {'case_name': '1', 'votes': '3.1'}
+    with ExtractionCache(tmp_path / 'cache.sqlite') as cache:
+        cache.put('abc', versions, {'case_name': {'case_name': 'State v. Smith'}, 'votes': {'j1_vote': 1}})
+    with ExtractionCache(tmp_path / 'cache.sqlite') as cache:
+        assert cache.get('abc', versions) == {'case_name': {'case_name': 'State v. Smith'}, 'votes': {'j1_vote': 1}}
+        assert cache.get('abc', {**versions, 'votes': '4.1'}) == {'case_name': {'case_name': 'State v. Smith'}}
+        assert cache.get('def', versions) == {}
+
+
+def test_cached_run_reads_no_rtf(tmp_path, monkeypatch):
+    folder = tmp_path / 'AZ'
+    paths = write_corpus(tmp_path, 8, seed=4, states=['AZ'], body_paragraphs=(2, 4))
+    cache_path = tmp_path / 'cache.sqlite'
+    process_rtf_folder(folder, tmp_path / 'first.csv', cache_path=cache_path)
+    with ExtractionCache(cache_path) as cache:
+        assert all(len(cache.get(file_digest(path), field_group_versions())) == len(field_group_versions()) for path in paths)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("an RTF was decoded on a fully cached run")
+    monkeypatch.setattr(MainCode, 'extract_text_from_rtf', fail)
+    process_rtf_folder(folder, tmp_path / 'second.csv', cache_path=cache_path)
+    assert (tmp_path / 'second.csv').read_text() == (tmp_path / 'first.csv').read_text()
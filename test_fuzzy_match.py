@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+import fuzzy_match
+from fuzzy_match import fuzzy_match_judges, jaro_winkler, judge_blocks, match_chunk, name_similarity
+
+JUDGES = {'AZ': {'Bolick': 28, 'Timmer': 25}, 'NM': {'Vargas': 200}}
+
+
+def contributors(*rows):
+    return pd.DataFrame(rows, columns=['bonica.cid', 'most.recent.contributor.name', 'most.recent.contributor.state',
+                                       'most.recent.contributor.employer', 'most.recent.contributor.zipcode'])
+
+
+def test_jaro_winkler_reference_values():
+    assert jaro_winkler('martha', 'marhta') == pytest.approx(0.9611, abs=1e-4)
+    assert jaro_winkler('dixon', 'dicksonx') == pytest.approx(0.8133, abs=1e-4)
+    assert jaro_winkler('bolick', 'bolick') == 1.0
+    assert jaro_winkler('', 'bolick') == 0.0
+
+
+def test_close_spelling_in_the_same_block_matches():
+    chunk = contributors((1, 'BOLLICK, CLINT', 'AZ', 'LAWYER', '85001'), (2, 'TIMER, ANN', ' az', None, None))
+    candidates = match_chunk(chunk, judge_blocks(JUDGES))
+    assert candidates[['bonica.cid', 'justice_code', 'matched_word']].values.tolist() == [[1, 28, 'bollick'], [2, 25, 'timer']]
+    assert (candidates['score'] >= fuzzy_match.MIN_SCORE).all()
+
+
+def test_threshold_is_inclusive():
+    chunk = contributors((1, 'BOLLICK, CLINT', 'AZ', None, None))
+    score = name_similarity('bollick', 'bolick')
+    assert len(match_chunk(chunk, judge_blocks(JUDGES), min_score=score)) == 1
+    assert len(match_chunk(chunk, judge_blocks(JUDGES), min_score=score + 1e-9)) == 0
+
+
+def test_other_blocks_are_never_compared(monkeypatch):
+    compared = []
+
+    def recording_similarity(word, judge_name):
+        compared.append((word, judge_name))
+        return jaro_winkler(word, judge_name)
+    monkeypatch.setattr(fuzzy_match, 'name_similarity', recording_similarity)
+    # Bolick in NM, Vargas in AZ and Colick (another first letter) are in other blocks than their
+    # judges; only Bob shares a block (AZ, b) with Bolick
+    chunk = contributors((1, 'BOLICK, CLINT', 'NM', None, None), (2, 'VARGAS, ED', 'AZ', None, None), (3, 'COLICK, BOB', 'AZ', None, None))
+    assert match_chunk(chunk, judge_blocks(JUDGES)).empty
+    assert compared == [('bob', 'bolick')]
+
+
+def test_fuzzy_match_judges_on_a_file(tmp_path):
+    chunk = contributors((1, 'BOLLICK, CLINT', 'AZ', None, '85001'), (2, 'VARGOS, EDWARD', 'NM', None, '87501'), (3, 'SMITH, JOHN', 'AZ', None, None))
+    chunk.to_csv(tmp_path / 'contributors.csv', index=False)
+    candidates = fuzzy_match_judges(str(tmp_path / 'contributors.csv'), str(tmp_path / 'candidates.csv'), block_size=40, workers=2, judge_codes=JUDGES)
+    assert candidates[['justice_code', 'rank', 'bonica.cid']].values.tolist() == [[28, 1, 1], [200, 1, 2]]
+    assert len(pd.read_csv(tmp_path / 'candidates.csv')) == 2
+
+
+def test_file_without_contributors(tmp_path):
+    contributors().to_csv(tmp_path / 'contributors.csv', index=False)
+    candidates = fuzzy_match_judges(str(tmp_path / 'contributors.csv'), str(tmp_path / 'candidates.csv'), judge_codes=JUDGES)
+    assert candidates.empty
+    assert list(pd.read_csv(tmp_path / 'candidates.csv').columns) == ['justice_code', 'rank'] + fuzzy_match.CANDIDATE_FIELDS[1:]
@@ -0,0 +1,138 @@
+import json
+import pandas as pd
+import pytest
+import hybrid_extraction
+from MainCode import ParsedCase, field_group_confidence, party_confidence
+from hybrid_extraction import CONFIDENCE_THRESHOLD, extract_hybrid, process_rtf_folder_hybrid
+from synthetic_corpus import case_to_rtf
+
+CASE_LINES = [
+    '1. Ray Hollis v. Dana Pruitt, 2019 Ariz. LEXIS 412',
+    '',
+    'Supreme Court of Arizona',
+    'March 4, 2019, Filed',
+    '',
+    'RAY HOLLIS, Appellant, v. DANA PRUITT, Appellee.',
+    '',
+    'Prior History',
+    'Appeal from the Superior Court of Pima County, No. 4411.',
+    '',
+    'Outcome',
+    'Affirmed.',
+    '',
+    'Judges: BRUTINEL, C.J., TIMMER and BOLICK, JJ., concur. LOPEZ, J., dissents.',
+    '',
+    'Opinion by: BRUTINEL',
+    'Dissent by: LOPEZ',
+    '',
+    'Opinion',
+    '',
+    'The judgment is affirmed.',
+]
+
+
+@pytest.fixture
+def case_path(tmp_path):
+    folder = tmp_path / 'AZ'
+    folder.mkdir()
+    path = folder / 'case_000001.rtf'
+    path.write_text(case_to_rtf(CASE_LINES))
+    return path
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Stubs request_completion; set llm.answer, read llm.prompts."""
+    class StubLLM:
+        def __init__(self):
+            self.answer = {}
+            self.prompts = []
+
+        def __call__(self, prompt):
+            self.prompts.append(prompt)
+            return json.dumps(self.answer)
+    stub = StubLLM()
+    monkeypatch.setattr(hybrid_extraction, 'request_completion', stub)
+    return stub
+
+
+def unsure_of(monkeypatch, *groups):
+    # Every group is confident except the given ones
+    for group in field_group_confidence:
+        monkeypatch.setitem(field_group_confidence, group, lambda case, fields, low=group in groups: 0.1 if low else 1.0)
+
+
+def test_confident_case_makes_no_request(case_path, llm, monkeypatch):
+    unsure_of(monkeypatch)
+    groups, llm_groups = extract_hybrid(case_path)
+    assert llm_groups == [] and llm.prompts == []
+    assert groups['confidence']['llm_groups'] == ''
+
+
+def test_only_unsure_groups_are_asked(case_path, llm, monkeypatch):
+    unsure_of(monkeypatch, 'parties', 'law_area')
+    llm.answer = {'appellant': 'Ray Hollis', 'appellee': 'Dana Pruitt', 'LegalArea': 'Torts'}
+    groups, llm_groups = extract_hybrid(case_path)
+    assert llm_groups == ['parties', 'law_area']
+    prompt, = llm.prompts
+    assert '"appellant"' in prompt and '"LegalArea"' in prompt
+    assert '"Disposition"' not in prompt and '"J1_Name"' not in prompt and '"Title_P1"' not in prompt
+    assert groups['parties'] == {'appellant': 'Ray Hollis', 'appellee': 'Dana Pruitt'}
+    assert groups['law_area'] == {'law_area': 'Torts'}
+    assert groups['confidence']['parties_confidence'] == 0.1
+    assert groups['confidence']['case_name_confidence'] == 1.0
+
+
+def test_answers_map_to_maincode_codes(case_path, llm, monkeypatch):
+    unsure_of(monkeypatch, *field_group_confidence)
+    llm.answer = {
+        'Title_P1': 'Hollis', 'Title_P2': 'Pruitt', 'LexisNexisCitation': '2019 Ariz. LEXIS 412',
+        'Month': 3, 'Day': '4', 'Year': 2019,
+        'Disposition': 7, 'court_decision': 3, 'outcome_text': 'Affirmed in part, reversed in part, and remanded.',
+        'opinion_author': 'BRUTINEL', 'dissent_authors': ['LOPEZ'],
+        'J1_Name': 'Brutinel', 'J1_Vote': 1, 'J2_Name': 'Lopez', 'J2_Vote': 0, 'J3_Name': 'Bolick', 'J3_Vote': 2,
+        'PriorHistory': 'Superior Court of Pima County',
+    }
+    groups, _ = extract_hybrid(case_path)
+    assert groups['case_name'] == {'case_name': 'Hollis v. Pruitt'}
+    assert str(groups['decision_date']['decision_date']) == '2019-03-04'
+    # The prompt's 7 and 3 are MainCode's 8 (affirmed/reversed in part and remanded) and mixed
+    assert (groups['disposition']['disposition_code'], groups['disposition']['court_decision']) == (8, 3)
+    assert groups['authors']['concurring_authors'] == []  # regex value kept
+    assert groups['votes']['justices'] == ['BRUTINEL', 'LOPEZ', 'BOLICK']
+    assert groups['votes']['votes_original'] == 'BRUTINEL, 2; LOPEZ, 1; BOLICK, 4'
+    assert groups['prior_history'] == {'prior_history': 'Superior Court of Pima County'}
+
+
+def test_votes_are_rebuilt_from_an_answered_disposition(case_path, llm, monkeypatch):
+    # "Affirmed." is an appellee win to the regexes; the LLM says the appellant won
+    unsure_of(monkeypatch, 'disposition')
+    llm.answer = {'Disposition': 3, 'court_decision': 1, 'outcome_text': 'Reversed.'}
+    regex_case = ParsedCase(hybrid_extraction.extract_text_from_rtf(str(case_path)))
+    assert regex_case.court_decision == 1
+    assert regex_case.votes_appellant_appellee == {'BRUTINEL': 1, 'TIMMER': 1, 'BOLICK': 1, 'LOPEZ': 2}
+
+    groups, llm_groups = extract_hybrid(case_path)
+    assert llm_groups == ['disposition']
+    assert groups['disposition']['court_decision'] == 2
+    assert groups['votes']['votes_appellant_appellee'] == 'BRUTINEL, 2; TIMMER, 2; BOLICK, 2; LOPEZ, 1'
+    assert [groups['votes'][f"j{i}_vote"] for i in range(1, 5)] == [2, 2, 2, 1]
+
+
+def test_folder_csv_and_cached_responses(case_path, llm, monkeypatch, tmp_path):
+    unsure_of(monkeypatch, 'law_area')
+    llm.answer = {'LegalArea': 'Torts'}
+    cache_path = tmp_path / 'responses.sqlite'
+    for run in ('first', 'second'):
+        process_rtf_folder_hybrid(case_path.parent, tmp_path / f"{run}.csv", cache_path=str(cache_path))
+    assert len(llm.prompts) == 1  # the second run is answered from the cache
+    rows = pd.read_csv(tmp_path / 'second.csv')
+    assert rows[['state', 'law_area', 'llm_groups', 'law_area_confidence']].values.tolist() == [['AZ', 'Torts', 'law_area', 0.1]]
+    assert rows['disposition_code'].tolist() == [2]
+
+
+def test_party_confidence():
+    case = ParsedCase('RAY HOLLIS, Appellant, v. DANA PRUITT, Appellee.')
+    assert party_confidence(case, {'appellant': 'RAY HOLLIS', 'appellee': 'DANA PRUITT'}) >= CONFIDENCE_THRESHOLD
+    assert party_confidence(case, {'appellant': 'RAY HOLLIS, Appellant', 'appellee': 'DANA PRUITT'}) < CONFIDENCE_THRESHOLD
+    assert party_confidence(case, {'appellant': '', 'appellee': 'DANA PRUITT'}) == 0.0
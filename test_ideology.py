@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from MainCode import process_rtf_folder
+from case_votes import load_votes
+from ideology import CONSERVATIVE, LIBERAL, add_ideology, compute_ideology, vote_matrix
+from synthetic_corpus import write_corpus
+
+VOTES = pd.DataFrame({
+    'case_id': [0, 0, 0, 1, 1, 1],
+    'seat': [1, 2, 3, 1, 2, 3],
+    'judge_code': [10, 11, 12, 10, 11, 12],
+    'vote': [1, 1, 0, 1, 1, 1],
+})
+SCORES = np.full(13, np.nan)
+SCORES[[10, 11, 12]] = [-1.0, -0.5, 1.0]
+
+
+def test_vote_matrix_rows_follow_case_ids():
+    codes, vote = vote_matrix(VOTES, [1, 0, 7])
+    assert codes.tolist() == [[10, 11, 12], [10, 11, 12], [-1, -1, -1]]
+    assert vote.tolist() == [[1, 1, 1], [1, 1, 0], [-1, -1, -1]]
+
+
+def test_vote_matrix_without_cases():
+    codes, vote = vote_matrix(VOTES, [])
+    assert codes.shape == vote.shape == (0, 0)
+    assert len(compute_ideology(codes, vote, SCORES)) == 0
+
+
+def test_direction_needs_dissenters():
+    ideology = compute_ideology(*vote_matrix(VOTES, [0, 1]), SCORES)
+    # Case 0: the liberal majority outvoted a conservative dissenter; case 1 is unanimous
+    assert ideology['outcome_direction'].iloc[0] == LIBERAL
+    assert pd.isna(ideology['outcome_direction'].iloc[1])
+    assert ideology['majority_cf'].tolist() == pytest.approx([-0.75, -1 / 6])
+    assert ideology['median_cf'].tolist() == [-0.5, -0.5]
+    assert CONSERVATIVE not in ideology['outcome_direction'].dropna().tolist()
+
+
+def test_maincode_output_needs_its_vote_table(tmp_path):
+    write_corpus(tmp_path / 'corpus', 12, seed=9, states=['AZ'], body_paragraphs=(2, 4))
+    process_rtf_folder(tmp_path / 'corpus' / 'AZ', tmp_path / 'cases.csv', votes_output=tmp_path / 'votes.csv')
+    cases = pd.read_csv(tmp_path / 'cases.csv')
+    # The wide j*_vote columns are appellant/appellee votes, not majority/minority
+    with pytest.raises(ValueError, match='case_votes'):
+        add_ideology(cases)
+    ideology = add_ideology(cases, votes=load_votes(str(tmp_path / 'votes.csv')))
+    assert ideology['median_cf'].notna().all()
+    assert ideology['outcome_direction'].notna().any()
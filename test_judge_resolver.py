@@ -0,0 +1,59 @@
+import re
+import unicodedata
+import pandas as pd
+import pytest
+from JUDGE_CODES import JUDGE_CODES
+from judge_resolver import build_judge_index, resolve_judges, resolve_votes
+
+
+@pytest.fixture(scope='module')
+def index():
+    return build_judge_index()
+
+
+def fold(name):
+    return re.sub(r'[^a-z]', '', unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii').lower())
+
+
+def lookup_row(state, name):
+    # One name at a time: whole name first, then its last word
+    if not isinstance(state, str) or not isinstance(name, str) or not name.strip():
+        return None
+    codes = {fold(judge): code for judge, code in JUDGE_CODES.get(state.strip().upper(), {}).items()}
+    code = codes.get(fold(name))
+    if code is None:
+        words = re.sub(r'[,\s]+(jr|sr|ii|iii|iv)\.?\s*$', '', name, flags=re.IGNORECASE).split()
+        code = codes.get(fold(words[-1])) if words else None
+    return code
+
+
+def test_same_name_resolves_by_state_and_accents_fold(index):
+    cases = pd.DataFrame({
+        'state': ['CT', 'IA', 'co', 'CO', 'CT', 'WY'],
+        'J1_Name': ['McDonald', 'MCDONALD', 'Márquez', 'MARQUEZ', "Justice Gregory T. D'Auria", 'McDonald'],
+        'J2_Name': ['DAURIA', 'Christopher McDonald Jr.', None, '', 'Ecker', 'Nobody'],
+    })
+    resolved = resolve_judges(cases, index=index)
+    assert resolved['J1_Code'].tolist() == [46, 88, 44, 44, 51, pd.NA]
+    assert resolved['J2_Code'].tolist() == [51, 88, pd.NA, pd.NA, 47, pd.NA]
+    cf_scores = index[1]
+    assert resolved['J1_CF'].iloc[0] == pytest.approx(cf_scores[46])
+    assert resolved['J1_CF'].iloc[1] == pytest.approx(cf_scores[88])
+
+
+def test_existing_codes_are_kept(index):
+    cases = pd.DataFrame({'state': ['IA', 'IA'], 'J1_Name': ['McDonald', 'McDonald'], 'J1_Code': [88, None]})
+    assert resolve_judges(cases, index=index)['J1_Code'].tolist() == [88, 88]
+    votes = pd.DataFrame({'state': ['CT', 'IA'], 'judge_name': ['McDonald', 'McDonald'], 'judge_code': [None, None]})
+    assert resolve_votes(votes, index=index)['judge_code'].tolist() == [46, 88]
+
+
+def test_matches_row_wise_lookup(index):
+    cases = pd.read_csv('combined_output_all_runs.csv', low_memory=False).sample(500, random_state=0)
+    names = [column for column in cases.columns if re.fullmatch(r'J\d+_Name', column)]
+    cases = cases[['state'] + names]  # no codes, so every name is looked up
+    resolved = resolve_judges(cases, index=index)
+    for column in names:
+        expected = [lookup_row(state, name) for state, name in zip(cases['state'], cases[column])]
+        actual = [None if pd.isna(code) else code for code in resolved[column.replace('Name', 'Code')]]
+        assert actual == expected, column
@@ -0,0 +1,127 @@
+import asyncio
+import contextlib
+import csv
+import json
+import os
+import re
+import time
+import aiohttp
+import openai
+from aiohttp import web
+from llm_async import RateLimiter, aprocess_all_states, aprocess_state_folder
+
+FILES = 8
+CONCURRENCY = 3
+REQUESTS_PER_MINUTE = 600  # one request every 0.1s once the bucket is empty
+
+
+class StubCompletions:
+    """Completions endpoint that answers 429 (with Retry-After) to its 3rd request and 503 to its 5th."""
+
+    def __init__(self):
+        self.arrivals = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, request):
+        body = await request.json()
+        self.arrivals.append(time.monotonic())
+        if len(self.arrivals) == 3:
+            return web.json_response({'error': {'message': 'slow down', 'type': 'requests'}}, status=429, headers={'Retry-After': '0.05'})
+        if len(self.arrivals) == 5:
+            return web.json_response({'error': {'message': 'overloaded', 'type': 'server_error'}}, status=503)
+        number = int(re.search(r'Case (\d+)', body['prompt']).group(1))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Later files answer sooner, so requests finish out of file order
+        await asyncio.sleep(0.05 * (FILES - number))
+        self.in_flight -= 1
+        row = {'state': 'AZ', 'Title_P1': f"Case {number}"}
+        return web.json_response({
+            'id': f"cmpl-{number}", 'object': 'text_completion', 'model': body['model'],
+            'choices': [{'text': json.dumps(row), 'index': 0, 'finish_reason': 'stop'}],
+        })
+
+
+@contextlib.asynccontextmanager
+async def stub_server(handle):
+    # Points openai at a local server answering /v1/completions with handle
+    app = web.Application()
+    app.router.add_post('/v1/completions', handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    api_base, api_key = openai.api_base, openai.api_key
+    openai.api_base, openai.api_key = f"http://127.0.0.1:{port}/v1", 'test'
+    try:
+        yield
+    finally:
+        openai.api_base, openai.api_key = api_base, api_key
+        await runner.cleanup()
+
+
+async def run_against_stub(stub, folder):
+    limiter = RateLimiter(requests_per_minute=REQUESTS_PER_MINUTE)
+    for bucket, _ in limiter.buckets:
+        bucket.tokens = 0  # start empty so that every request is paced
+    async with stub_server(stub.handle), aiohttp.ClientSession() as session:
+        openai.aiosession.set(session)
+        return await aprocess_state_folder(folder, 'AZ', concurrency=CONCURRENCY, limiter=limiter)
+
+
+def test_aprocess_state_folder_against_stub(tmp_path, monkeypatch, capsys):
+    folder = tmp_path / 'AZ'
+    folder.mkdir()
+    for number in range(FILES):
+        (folder / f"case{number}.rtf").write_text(f"{{\\rtf1\\ansi Case {number}\\par}}")
+    monkeypatch.chdir(tmp_path)
+    stub = StubCompletions()
+
+    rows_written = asyncio.run(run_against_stub(stub, folder))
+
+    assert rows_written == FILES
+    assert stub.max_in_flight == CONCURRENCY
+    # Two retries, both announced
+    assert len(stub.arrivals) == FILES + 2
+    assert capsys.readouterr().out.count('Retrying in') == 2
+    # Requests leave the limiter no faster than REQUESTS_PER_MINUTE
+    gaps = len(stub.arrivals) - 1
+    assert stub.arrivals[-1] - stub.arrivals[0] >= 0.9 * gaps * 60 / REQUESTS_PER_MINUTE
+    with open('output_AZ.csv', newline='') as file:
+        titles = [row['Title_P1'] for row in csv.DictReader(file)]
+    expected = [f"Case {filename[4:-4]}" for filename in os.listdir(folder)]
+    assert titles == expected
+
+
+async def echo_completion(request):
+    body = await request.json()
+    state, number = re.search(r'([A-Z]{2}) case (\d+)', body['prompt']).groups()
+    row = {'state': state, 'Title_P1': f"Case {number}"}
+    return web.json_response({
+        'id': f"cmpl-{state}{number}", 'object': 'text_completion', 'model': body['model'],
+        'choices': [{'text': json.dumps(row), 'index': 0, 'finish_reason': 'stop'}],
+    })
+
+
+def test_aprocess_all_states_merges_state_csvs(tmp_path, monkeypatch):
+    for state in ('NM', 'AZ'):
+        (tmp_path / 'States' / state).mkdir(parents=True)
+        for number in range(3):
+            (tmp_path / 'States' / state / f"case{number}.rtf").write_text(f"{{\\rtf1\\ansi {state} case {number}\\par}}")
+    monkeypatch.chdir(tmp_path)
+
+    async def run():
+        async with stub_server(echo_completion):
+            await aprocess_all_states(str(tmp_path / 'States'), concurrency=2)
+    asyncio.run(run())
+
+    with open('combined_output_all_states.csv', newline='') as file:
+        combined = list(csv.DictReader(file))
+    shard_rows = []
+    for state in ('AZ', 'NM'):
+        with open(f"output_{state}.csv", newline='') as file:
+            shard_rows += list(csv.DictReader(file))
+    assert [(row['state'], row['Title_P1']) for row in combined] == [(row['state'], row['Title_P1']) for row in shard_rows]
+    assert [row['state'] for row in combined] == ['AZ'] * 3 + ['NM'] * 3
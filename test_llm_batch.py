@@ -0,0 +1,52 @@
+import csv
+import json
+from llm_batch import build_outputs_from_batch, ingest_batch_results, write_batch_requests
+
+CASES = {'AZ': ['a.rtf', 'b.rtf', 'c.rtf'], 'CA': ['d.rtf', 'e.rtf']}
+
+
+def completion_line(request):
+    row = {'state': request['custom_id'][:2], 'Title_P1': request['custom_id']}
+    return {
+        'id': f"batch_req_{request['custom_id']}",
+        'custom_id': request['custom_id'],
+        'response': {'status_code': 200, 'body': {'choices': [{'text': json.dumps(row), 'index': 0}]}},
+        'error': None,
+    }
+
+
+def test_batch_round_trip(tmp_path, monkeypatch):
+    base_folder = tmp_path / 'States'
+    for state_code, filenames in CASES.items():
+        (base_folder / state_code).mkdir(parents=True)
+        for filename in filenames:
+            (base_folder / state_code / filename).write_text(f"{{\\rtf1\\ansi Case {state_code} {filename}\\par}}")
+    monkeypatch.chdir(tmp_path)
+    cache_path = tmp_path / 'responses.sqlite'
+
+    assert write_batch_requests(base_folder, 'requests.jsonl', cache_path) == 5
+    with open('requests.jsonl', encoding='utf-8') as file:
+        requests = [json.loads(line) for line in file]
+    assert [request['custom_id'] for request in requests] == ['AZ/a.rtf', 'AZ/b.rtf', 'AZ/c.rtf', 'CA/d.rtf', 'CA/e.rtf']
+
+    # AZ/b.rtf failed with an error, AZ/c.rtf has neither a response nor an
+    # error, CA/d.rtf appears twice, two error lines have no custom_id and the
+    # file ends in a truncated CA/e.rtf line
+    lines = [json.dumps(completion_line(request)) for request in requests]
+    lines[1] = json.dumps({'id': 'batch_req_b', 'custom_id': 'AZ/b.rtf', 'response': None, 'error': {'code': 'server_error', 'message': 'failed'}})
+    lines[2] = json.dumps({'id': 'batch_req_c', 'custom_id': 'AZ/c.rtf', 'response': None, 'error': None})
+    lines.insert(4, lines[3])
+    lines.insert(0, json.dumps({'id': 'batch_req_x', 'response': None, 'error': {'code': 'invalid_request', 'message': 'bad line'}}))
+    lines.insert(3, json.dumps({'id': 'batch_req_y', 'custom_id': None, 'error': {'code': 'server_error'}}))
+    lines[-1] = lines[-1][:40]
+    (tmp_path / 'results.jsonl').write_text('\n'.join(lines), encoding='utf-8')
+
+    assert ingest_batch_results(tmp_path / 'results.jsonl', base_folder, cache_path) == 2
+    # Ingesting again is harmless, and the remaining requests are written again
+    assert ingest_batch_results(tmp_path / 'results.jsonl', base_folder, cache_path) == 2
+    assert write_batch_requests(base_folder, 'retry.jsonl', cache_path) == 3
+
+    build_outputs_from_batch(base_folder, cache_path)
+    with open('combined_output_all_states.csv', newline='') as file:
+        titles = sorted(row['Title_P1'] for row in csv.DictReader(file))
+    assert titles == ['AZ/a.rtf', 'CA/d.rtf']
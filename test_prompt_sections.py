@@ -0,0 +1,65 @@
+import llm_async
+from prompt_sections import trim_case_text
+
+CASE_TEXT = """1. State v. Smith, 2021 Ariz. LEXIS 12
+
+Supreme Court of Arizona
+May 4, 2021, Filed
+
+Prior History
+Appeal from the Superior Court in Maricopa County,
+No. CR2018-0042, the Honorable Jane Doe, Judge.
+
+Disposition
+Vacated in part and remanded
+for resentencing.
+
+Core Terms
+sentence, remand, jury,
+restitution
+
+Outcome
+Conviction affirmed;
+sentence vacated.
+
+Judges: BRUTINEL, C.J., TIMMER, V.C.J., and BOLICK, J., concur.
+
+Opinion by: BRUTINEL
+
+Opinion
+The body of the opinion is not part of the prompt."""
+
+
+def test_trim_keeps_whole_paragraphs():
+    trimmed = trim_case_text(CASE_TEXT)
+    assert 'Appeal from the Superior Court in Maricopa County,\nNo. CR2018-0042, the Honorable Jane Doe, Judge.' in trimmed
+    assert 'Outcome\nConviction affirmed;\nsentence vacated.' in trimmed
+    assert 'Judges: BRUTINEL' in trimmed
+    assert 'Opinion by: BRUTINEL' in trimmed
+    # Sections the prompt does not use are left out, however long
+    assert 'for resentencing' not in trimmed
+    assert 'restitution' not in trimmed
+    assert 'body of the opinion' not in trimmed
+
+
+def test_trim_keeps_a_paragraph_at_the_end_of_the_text():
+    trimmed = trim_case_text("1. State v. Smith\n\nOutcome\nConviction affirmed;\nsentence vacated.")
+    assert trimmed.endswith('Outcome\nConviction affirmed;\nsentence vacated.')
+
+
+def test_prompt_tokens_counted_once(monkeypatch):
+    counted = []
+
+    def count_tokens(text, model='gpt-4'):
+        counted.append(text)
+        return 123
+
+    async def acreate(**kwargs):
+        return type('Response', (), {'choices': [type('Choice', (), {'text': '{"state": "AZ"}'})]})
+
+    monkeypatch.setattr(llm_async, 'count_tokens', count_tokens)
+    monkeypatch.setattr(llm_async, 'extract_text_from_rtf', lambda file_path: CASE_TEXT)
+    monkeypatch.setattr(llm_async.openai.Completion, 'acreate', acreate)
+    result = llm_async.asyncio.run(llm_async.aprocess_rtf_file_with_api('case.rtf', llm_async.RateLimiter(tokens_per_minute=10000)))
+    assert result == {'state': 'AZ', 'prompt_tokens': 123}
+    assert len(counted) == 1
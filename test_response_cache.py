@@ -0,0 +1,44 @@
+import sqlite3
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from response_cache import BUSY_TIMEOUT, ResponseCache, ResponseCacheMiss
+
+WRITERS = 4
+RESPONSES_PER_WRITER = 200
+
+
+def test_responses_round_trip_by_model_and_prompt_version(tmp_path):
+    cache_path = str(tmp_path / 'responses.sqlite')
+    with ResponseCache(cache_path) as response_cache:
+        assert response_cache.get("case text", 'gpt-4', 1) is None
+        response_cache.put("case text", 'gpt-4', 1, "Case Name: State v. Smith")
+    with ResponseCache(cache_path, offline=True) as response_cache:
+        assert response_cache.get("case text", 'gpt-4', 1) == "Case Name: State v. Smith"
+        for text, model, prompt_version in [("case text", 'gpt-4', 2), ("case text", 'gpt-3.5-turbo', 1), ("other text", 'gpt-4', 1)]:
+            with pytest.raises(ResponseCacheMiss):
+                response_cache.get(text, model, prompt_version)
+        assert (response_cache.hits, response_cache.misses) == (1, 3)
+
+
+def write_responses(cache_path, writer):
+    with ResponseCache(cache_path) as response_cache:
+        for i in range(RESPONSES_PER_WRITER):
+            response_cache.put(f"case {writer}-{i}", 'gpt-4', 1, f"response {writer}-{i}")
+    return writer
+
+
+def test_concurrent_writers_keep_every_response(tmp_path):
+    cache_path = str(tmp_path / 'responses.sqlite')
+    ResponseCache(cache_path).close()
+    with ProcessPoolExecutor(max_workers=WRITERS) as executor:
+        assert sorted(executor.map(write_responses, [cache_path] * WRITERS, range(WRITERS))) == list(range(WRITERS))
+    with sqlite3.connect(cache_path) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0] == WRITERS * RESPONSES_PER_WRITER
+    with ResponseCache(cache_path, offline=True) as response_cache:
+        assert response_cache.get(f"case {WRITERS - 1}-0", 'gpt-4', 1) == f"response {WRITERS - 1}-0"
+
+
+def test_cache_waits_for_other_writers(tmp_path):
+    with ResponseCache(str(tmp_path / 'responses.sqlite')) as response_cache:
+        assert response_cache.connection.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert response_cache.connection.execute("PRAGMA busy_timeout").fetchone()[0] == BUSY_TIMEOUT * 1000
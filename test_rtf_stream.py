@@ -0,0 +1,60 @@
+import re
+import pytest
+from striprtf.striprtf import rtf_to_text
+from MainCode import process_rtf_file
+from rtf_stream import iter_rtf_text, rtf_header_text
+from synthetic_corpus import write_corpus
+
+# Seat columns and vote rows also read "JUSTICE X, dissenting." lines in the
+# opinion body, which header-only mode does not decode
+BODY_FIELDS = re.compile(r'j\d+_|case_votes$')
+
+
+@pytest.fixture(scope='module')
+def corpus(tmp_path_factory):
+    return write_corpus(tmp_path_factory.mktemp('corpus'), 60, seed=6, body_paragraphs=(2, 6))
+
+
+def test_header_only_matches_full_text(corpus):
+    for path in corpus:
+        full = process_rtf_file(path)
+        header = process_rtf_file(path, header_only=True)
+        differences = {field: (full[field], header[field]) for field in full if full[field] != header[field] and not BODY_FIELDS.match(field)}
+        assert differences == {}, path
+
+
+def test_header_keeps_author_block(corpus):
+    for path in corpus:
+        text, complete = rtf_header_text(path)
+        assert not complete
+        assert re.search(r'^Judges:', text, re.MULTILINE)
+        for line in ('Opinion by:', 'Concur by:', 'Dissent by:'):
+            with open(path) as file:
+                if line in file.read():
+                    assert line in text, path
+
+
+def test_header_does_not_depend_on_block_size(corpus):
+    for path in corpus[:10]:
+        assert rtf_header_text(path, block_size=64) == rtf_header_text(path)
+
+
+def test_font_table_after_first_block(tmp_path):
+    path = tmp_path / 'cyrillic.rtf'
+    path.write_text('{\\rtf1\\ansi\\deff0' + ' ' * 300 + "{\\fonttbl{\\f0\\fcharset204 Arial;}}\\f0 \\'c0\\'e1\\'e2\\par}")
+    text = ''.join(iter_rtf_text(path, block_size=64))
+    assert text.strip() == 'Абв'
+    assert text == rtf_to_text(path.read_text())
+
+
+def test_long_line_without_newlines(tmp_path):
+    path = tmp_path / 'one_line.rtf'
+    path.write_text('{\\rtf1\\ansi{\\fonttbl{\\f0 Arial;}}' + '{\\b word} ' * 2000 + '}')
+    assert ''.join(iter_rtf_text(path, block_size=256)) == rtf_to_text(path.read_text())
+
+
+@pytest.mark.parametrize('block_size', [64, 4096, 1 << 16])
+def test_stream_matches_rtf_to_text(corpus, block_size):
+    for path in corpus:
+        with open(path) as file:
+            assert ''.join(iter_rtf_text(path, block_size=block_size)) == rtf_to_text(file.read()), path
@@ -0,0 +1,51 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from split import split_parquet
+
+HEADER = 'most.recent.contributor.name,most.recent.contributor.state,amount,note'
+
+
+def read_partitions(output_dir):
+    return ds.dataset(output_dir, format='parquet', partitioning='hive').to_table()
+
+
+def test_column_empty_in_first_chunk(tmp_path):
+    # note is empty in the first chunk, so its type must not come from that chunk
+    lines = [HEADER] + [f"SMITH, JOHN {i},AZ,{i}," for i in range(4)] + ['DOE, JANE,NM,5,refund']
+    (tmp_path / 'contributors.csv').write_text('\n'.join(lines) + '\n')
+    split_parquet(str(tmp_path / 'contributors.csv'), str(tmp_path / 'partitioned'), chunk_size=2)
+    table = read_partitions(tmp_path / 'partitioned')
+    assert table.num_rows == 5
+    assert all(field.type == pa.string() for field in table.schema)
+    assert table.filter(ds.field('note').is_valid())['note'].to_pylist() == ['refund']
+
+
+def test_skipped_lines_are_counted(tmp_path, capsys):
+    # The last line has no newline; the bad line has too many fields
+    lines = [HEADER] + [f"SMITH, JOHN {i},AZ,{i}," for i in range(5)] + ['one,too,many,fields,here,now', 'DOE, JANE,NM,5,refund']
+    (tmp_path / 'contributors.csv').write_text('\n'.join(lines))
+    split_parquet(str(tmp_path / 'contributors.csv'), str(tmp_path / 'partitioned'), chunk_size=2)
+    assert f"Finished partitioning 6 rows into {tmp_path / 'partitioned'} (1 bad lines skipped)." in capsys.readouterr().out
+
+
+def test_partitions_round_trip(tmp_path):
+    contributors = pd.DataFrame({
+        'bonica.cid': [str(cid) for cid in range(1, 9)],
+        'most.recent.contributor.name': ['SMITH, JOHN', 'Jane Sample', 'BOLICK, CLINT', 'Mr. Ann Timmer', "O'BRIEN, PAT", '1ST BANK', '', 'smith, al'],
+        'most.recent.contributor.state': ['AZ', 'az', 'AZ', 'NM', 'NM', 'TX', 'AZ', 'Arizona'],
+        'most.recent.contributor.zipcode': ['85001', '85002', None, '87501', '87501', '75001', None, '85003'],
+    })
+    contributors.to_csv(tmp_path / 'contributors.csv', index=False)
+    split_parquet(str(tmp_path / 'contributors.csv'), str(tmp_path / 'partitioned'), chunk_size=3)
+    table = read_partitions(tmp_path / 'partitioned').to_pandas()
+
+    # "1ST BANK" cleans to "bank, 1st"; the blank name has no letter
+    assert table.groupby('name_key').size().to_dict() == {'_': 1, 'b': 2, 'o': 1, 's': 3, 't': 1}
+    assert table.groupby('state').size().to_dict() == {'AZ': 4, 'NM': 2, 'TX': 1, '__': 1}
+    assert sorted(os.listdir(tmp_path / 'partitioned' / 'name_key=s')) == ['state=AZ', 'state=__']
+    # Every value comes back as written, text and all
+    round_trip = table.sort_values('bonica.cid')[list(contributors.columns)].reset_index(drop=True)
+    expected = contributors.replace('', None)
+    assert round_trip.astype(object).where(round_trip.notna(), None).values.tolist() == expected.astype(object).where(expected.notna(), None).values.tolist()
@@ -0,0 +1,43 @@
+import os
+import text_cache
+from striprtf.striprtf import rtf_to_text
+from rtf_stream import rtf_header_text
+from synthetic_corpus import write_corpus
+from text_cache import TextCache
+
+
+def test_header_text_is_cached_by_file_stat(tmp_path, monkeypatch):
+    path, = write_corpus(tmp_path / 'corpus', 1)
+    cache = TextCache(tmp_path / 'cache')
+    header = cache.header_for(path)
+    assert header == rtf_header_text(path)[0]
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    def fail(*args):
+        raise AssertionError("the RTF was read on a cache hit")
+    monkeypatch.setattr(text_cache, 'rtf_header_text', fail)
+    monkeypatch.setattr(TextCache, 'lookup', fail)
+    assert cache.header_for(path) == header
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    monkeypatch.undo()
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert cache.header_for(path) == header
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_text_is_cached_by_content(tmp_path, monkeypatch):
+    path, = write_corpus(tmp_path / 'corpus', 1)
+    cache = TextCache(tmp_path / 'cache')
+    text = cache.text_for(path)
+    with open(path, encoding='utf-8', errors='ignore') as file:
+        assert text == rtf_to_text(file.read())
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    monkeypatch.setattr(text_cache, 'rtf_to_text', lambda *args: "converted again")
+    assert TextCache(tmp_path / 'cache').text_for(path) == text
+    with open(path, 'a') as file:
+        file.write(' ')
+    assert cache.text_for(path) == "converted again"
+    assert (cache.hits, cache.misses) == (0, 2)
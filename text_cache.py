@@ -0,0 +1,101 @@
+import gzip
+import hashlib
+import os
+import tempfile
+from striprtf.striprtf import rtf_to_text
+from rtf_stream import HEADER_VERSION, rtf_header_text
+
+# Set this to a directory to share converted text between MainCode.py,
+# chatgptoption.py and every other script that calls extract_text_from_rtf.
+TEXT_CACHE_ENV = 'RTF_TEXT_CACHE_DIR'
+
+
+def decode_rtf_bytes(rtf_bytes):
+    """Decodes raw RTF bytes the same way open(path, 'r', encoding='utf-8', errors='ignore') does."""
+    return rtf_bytes.decode('utf-8', errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
+
+
+class TextCache:
+    """Directory of gzip-compressed rtf_to_text output keyed by the SHA-256 of the RTF.
+
+    Entries are written to a temporary file and renamed into place, so several
+    processes can share one cache directory.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, digest):
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.txt.gz")
+
+    def get(self, digest):
+        """Returns the cached text for a digest, or None."""
+        try:
+            with gzip.open(self.path_for(digest), 'rt', encoding='utf-8', newline='') as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, digest, text):
+        path = self.path_for(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8', newline='') as file:
+                file.write(text)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def lookup(self, rtf_path):
+        """Returns (digest, cached text or None, raw RTF bytes) for an RTF file."""
+        with open(rtf_path, 'rb') as file:
+            rtf_bytes = file.read()
+        digest = hashlib.sha256(rtf_bytes).hexdigest()
+        return digest, self.get(digest), rtf_bytes
+
+    def text_for(self, rtf_path):
+        """Returns rtf_to_text of the file, converting it only on a cache miss."""
+        digest, text, rtf_bytes = self.lookup(rtf_path)
+        if text is not None:
+            self.hits += 1
+            return text
+        self.misses += 1
+        text = rtf_to_text(decode_rtf_bytes(rtf_bytes))
+        self.put(digest, text)
+        return text
+
+    def header_key(self, rtf_path):
+        """Key for the header-only text of a file, from its path, size and mtime so that no bytes are read."""
+        stat = os.stat(rtf_path)
+        key = f"header{HEADER_VERSION}:{os.path.abspath(rtf_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def header_for(self, rtf_path):
+        """Returns rtf_header_text's text for the file, decoding its header only on a cache miss."""
+        key = self.header_key(rtf_path)
+        text = self.get(key)
+        if text is not None:
+            self.hits += 1
+            return text
+        self.misses += 1
+        text, _ = rtf_header_text(rtf_path)
+        self.put(key, text)
+        return text
+
+
+_default_caches = {}
+
+
+def default_text_cache():
+    """Returns the TextCache for $RTF_TEXT_CACHE_DIR, or None if it is not set."""
+    cache_dir = os.environ.get(TEXT_CACHE_ENV)
+    if not cache_dir:
+        return None
+    if cache_dir not in _default_caches:
+        _default_caches[cache_dir] = TextCache(cache_dir)
+    return _default_caches[cache_dir]